@@ -0,0 +1,203 @@
+# Stack riêng cho mỗi worker (--hermetic): mongod tạm với dữ liệu trên tmpfs và app Node (src/index.js),
+# cả hai nghe trên cổng trống nên nhiều stack chạy song song trên một máy mà không đụng nhau
+# và không đụng app/database của người đang phát triển. App kết nối thẳng tới mongod; chỉ khi cần gây lỗi
+# kết nối (mongo_proxy) mới chèn fault_proxy.py vào giữa, chạy ở process riêng để không tranh GIL
+# với process đo (test, benchmark) và không làm sai số liệu thời gian.
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+from fault_proxy import RemoteFaultProxy
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.normpath(os.path.join(TESTS_DIR, ".."))
+LOGS_DIR = os.path.join(ROOT_DIR, "reports", "stack")
+STARTUP_TIMEOUT = 60
+# Driver của app chờ MongoDB tối đa chừng này ms trước khi trả lỗi (xem FAILURE_TIMEOUT trong fault_proxy.py)
+SERVER_SELECTION_TIMEOUT_MS = 3000
+
+
+def free_port(host="127.0.0.1"):
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+# Ưu tiên /dev/shm (tmpfs) để mongod không ghi ra đĩa; máy không có thì dùng thư mục tạm thường
+def default_tmpdir():
+    shm = "/dev/shm"
+    if os.path.isdir(shm) and os.access(shm, os.W_OK):
+        return shm
+    return tempfile.gettempdir()
+
+
+def _tail(path, lines=20):
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            return "".join(f.readlines()[-lines:])
+    except OSError:
+        return ""
+
+
+def _stop_process(process, timeout=10):
+    if process is None or process.poll() is not None:
+        return
+    process.terminate()
+    try:
+        process.wait(timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+class HermeticStack:
+    def __init__(self, mongod="mongod", node="node", db_name="travel", tmpdir=None, name="main", proxy=False):
+        self.mongod = mongod
+        self.node = node
+        self.db_name = db_name
+        self.tmpdir = tmpdir or default_tmpdir()
+        self.name = name
+        self.via_proxy = proxy
+        self.mongo_port = None
+        self.app_port = None
+        self.proxy_port = None
+        self.proxy = None
+        self._dbpath = None
+        self._mongod_process = None
+        self._proxy_process = None
+        self._app_process = None
+
+    @property
+    def mongo_uri(self):
+        return f"mongodb://127.0.0.1:{self.mongo_port}"
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.app_port}"
+
+    @property
+    def app_pid(self):
+        return self._app_process.pid if self._app_process else None
+
+    def _spawn(self, kind, args, **kwargs):
+        os.makedirs(LOGS_DIR, exist_ok=True)
+        log_path = os.path.join(LOGS_DIR, f"{self.name}-{kind}.log")
+        with open(log_path, "w", encoding="utf-8") as log:
+            try:
+                process = subprocess.Popen(args, stdout=log, stderr=subprocess.STDOUT, **kwargs)
+            except FileNotFoundError:
+                raise RuntimeError(f"Không tìm thấy {args[0]} (chỉ định bằng --mongod/--node)") from None
+        return process, log_path
+
+    # Chờ tới khi probe() trả True; báo lỗi ngay nếu process đã thoát
+    def _wait_ready(self, kind, process, log_path, probe, timeout=STARTUP_TIMEOUT):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"{kind} thoát với mã {process.returncode}:\n{_tail(log_path)}")
+            if probe():
+                return
+            time.sleep(0.1)
+        raise RuntimeError(f"{kind} chưa sẵn sàng sau {timeout}s:\n{_tail(log_path)}")
+
+    def _start_mongod(self):
+        self._dbpath = tempfile.mkdtemp(prefix=f"ttravel-mongod-{self.name}-", dir=self.tmpdir)
+        self.mongo_port = free_port()
+        self._mongod_process, log_path = self._spawn("mongod", [
+            self.mongod, "--dbpath", self._dbpath, "--port", str(self.mongo_port), "--bind_ip", "127.0.0.1",
+            "--wiredTigerCacheSizeGB", "0.25", "--setParameter", "diagnosticDataCollectionEnabled=false",
+        ])
+        client = MongoClient(self.mongo_uri, serverSelectionTimeoutMS=500, connectTimeoutMS=500)
+
+        def ping():
+            try:
+                client.admin.command("ping")
+                return True
+            except PyMongoError:
+                return False
+
+        try:
+            self._wait_ready("mongod", self._mongod_process, log_path, ping)
+        finally:
+            client.close()
+
+    def _start_proxy(self):
+        if self._proxy_process:
+            return
+        self.proxy_port, control = free_port(), ("127.0.0.1", free_port())
+        self._proxy_process, log_path = self._spawn("proxy", [
+            sys.executable, os.path.join(TESTS_DIR, "fault_proxy.py"), "--listen", f"127.0.0.1:{self.proxy_port}",
+            "--target", f"127.0.0.1:{self.mongo_port}", "--control", f"127.0.0.1:{control[1]}",
+        ])
+        self.proxy = RemoteFaultProxy(control, timeout=1)
+
+        # Cổng nghe được mở trước cổng điều khiển nên trả lời được stats là proxy đã sẵn sàng
+        def control_port():
+            try:
+                self.proxy.stats()
+                return True
+            except OSError:
+                return False
+
+        self._wait_ready("proxy", self._proxy_process, log_path, control_port)
+
+    def _start_app(self):
+        # Khởi động lại thì giữ cổng cũ để BASE_URL test đang dùng vẫn đúng
+        self.app_port = self.app_port or free_port()
+        port = self.proxy_port if self.via_proxy else self.mongo_port
+        uri = f"mongodb://127.0.0.1:{port}/{self.db_name}?serverSelectionTimeoutMS={SERVER_SELECTION_TIMEOUT_MS}"
+        env = dict(os.environ, PORT=str(self.app_port), MONGODB_URI=uri)
+        self._app_process, log_path = self._spawn("app", [self.node, "src/index.js"], cwd=ROOT_DIR, env=env)
+
+        # App vẫn mở cổng khi không kết nối được MongoDB, nên chỉ coi là sẵn sàng khi trang chủ
+        # trả 200: trang chủ chạy aggregate trên tours nên chỉ thành công khi đã kết nối mongod
+        def home_page():
+            try:
+                with urllib.request.urlopen(f"{self.base_url}/", timeout=2) as response:
+                    return response.status == 200
+            except (urllib.error.URLError, OSError):
+                return False
+
+        self._wait_ready("app", self._app_process, log_path, home_page)
+
+    def start(self):
+        try:
+            self._start_mongod()
+            if self.via_proxy:
+                self._start_proxy()
+            self._start_app()
+        except BaseException:
+            self.stop()
+            raise
+        return self
+
+    # Chuyển app sang kết nối MongoDB qua proxy hoặc trở lại kết nối thẳng: khởi động lại app
+    # (cùng cổng) với MONGODB_URI mới. Session đăng nhập lưu trong bộ nhớ app sẽ mất
+    def use_proxy(self, enabled=True):
+        if enabled == self.via_proxy:
+            return
+        if enabled:
+            self._start_proxy()
+        _stop_process(self._app_process)
+        self.via_proxy = enabled
+        self._start_app()
+
+    def stop(self):
+        _stop_process(self._app_process)
+        _stop_process(self._proxy_process)
+        _stop_process(self._mongod_process)
+        if self._dbpath:
+            shutil.rmtree(self._dbpath, ignore_errors=True)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,198 @@
+import glob
+import json
+import math
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+import http_client
+from app_stack import HermeticStack
+from db_fixtures import copy_indexes
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "reports", "benchmarks")
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    # Nearest-rank
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def latency_stats(latencies_ms, errors, elapsed):
+    values = sorted(latencies_ms)
+    total = len(values) + errors
+    return {
+        "requests": total,
+        "errors": errors,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "throughput_rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(values) / len(values), 2) if values else None,
+        "p50_ms": percentile(values, 50),
+        "p95_ms": percentile(values, 95),
+        "p99_ms": percentile(values, 99),
+        "max_ms": values[-1] if values else None,
+    }
+
+
+# Chạy các job song song, mỗi thread giữ một session HTTP riêng (kết nối được dùng lại).
+# job(session, payload) trả về True nếu request thành công. Kết quả gom theo category
+def run_concurrent(job, payloads, concurrency):
+    local = threading.local()
+    sessions = []
+    lock = threading.Lock()
+    results = {}
+
+    def run(item):
+        category, payload = item
+        if not hasattr(local, "session"):
+            local.session = http_client.new_session(pool_size=1)
+            with lock:
+                sessions.append(local.session)
+        start = time.perf_counter()
+        try:
+            ok = job(local.session, payload)
+        except Exception:
+            ok = False
+        latency = (time.perf_counter() - start) * 1000
+        with lock:
+            bucket = results.setdefault(category, {"latencies": [], "errors": 0})
+            if ok:
+                bucket["latencies"].append(round(latency, 3))
+            else:
+                bucket["errors"] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(run, payloads))
+    elapsed = time.perf_counter() - started
+    for session in sessions:
+        session.close()
+
+    stats = {category: latency_stats(bucket["latencies"], bucket["errors"], elapsed) for category, bucket in results.items()}
+    all_latencies = [v for bucket in results.values() for v in bucket["latencies"]]
+    all_errors = sum(bucket["errors"] for bucket in results.values())
+    stats["all"] = latency_stats(all_latencies, all_errors, elapsed)
+    return stats
+
+
+# --hermetic: chạy trên stack riêng (mongod tạm + app trên cổng trống) thay vì app đang chạy,
+# nhiều benchmark có thể chạy song song trên một máy mà không ảnh hưởng nhau.
+# --mongo-latency-ms: app nói chuyện với mongod qua fault_proxy.py, trễ thêm N ms mỗi gói app gửi đi,
+# để xem độ trễ phía MongoDB (mạng, replica ở xa) đẩy p95 của app lên bao nhiêu
+def add_stack_arguments(parser):
+    parser.add_argument("--hermetic", action="store_true", help="Tự chạy mongod tạm và app riêng cho lần benchmark này")
+    parser.add_argument("--mongod", default=os.environ.get("MONGOD", "mongod"))
+    parser.add_argument("--node", default=os.environ.get("NODE", "node"))
+    parser.add_argument("--mongo-latency-ms", type=int, default=0,
+                        help="Trễ thêm giữa app và MongoDB (ms, cần --hermetic)")
+
+
+@contextmanager
+def benchmark_stack(args):
+    if args.mongo_latency_ms < 0:
+        raise SystemExit("--mongo-latency-ms không được âm")
+    if not args.hermetic:
+        if args.mongo_latency_ms:
+            raise SystemExit("--mongo-latency-ms cần --hermetic: chỉ stack riêng mới chạy app qua proxy")
+        yield None
+        return
+    # Không có --mongo-latency-ms thì không chèn proxy: app nói chuyện thẳng với mongod để số liệu
+    # chỉ phản ánh app. Seed dữ liệu vẫn đi thẳng tới mongod (args.mongo_uri), không bị trễ
+    stack = HermeticStack(mongod=args.mongod, node=args.node, db_name=args.db_name, name=f"bench-{os.getpid()}",
+                          proxy=bool(args.mongo_latency_ms))
+    with stack:
+        args.base_url, args.mongo_uri = stack.base_url, stack.mongo_uri
+        print(f"Stack riêng: app {stack.base_url}, MongoDB {stack.mongo_uri}")
+        if args.mongo_latency_ms:
+            stack.proxy.set_latency(args.mongo_latency_ms)
+            print(f"App kết nối MongoDB qua proxy 127.0.0.1:{stack.proxy_port}, trễ thêm {args.mongo_latency_ms} ms")
+        yield stack
+
+
+# Cất collection thật sang tên khác trong lúc benchmark ghi dữ liệu sinh ra (giữ nguyên index),
+# trả lại khi xong
+@contextmanager
+def preserved_collection(db, name):
+    saved = f"__bench_saved_{name}"
+    had_original = name in db.list_collection_names()
+    if had_original and saved not in db.list_collection_names():
+        db[name].rename(saved)
+    if saved in db.list_collection_names():
+        copy_indexes(db[saved], db[name])
+    try:
+        yield db[name]
+    finally:
+        if had_original or saved in db.list_collection_names():
+            db[saved].rename(name, dropTarget=True)
+        else:
+            db[name].drop()
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_results(kind, results):
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    results = dict(results, kind=kind, revision=git_revision(), created_at=datetime.now().isoformat(timespec="seconds"))
+    path = os.path.join(RESULTS_DIR, f"{kind}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    return os.path.normpath(path)
+
+
+# Kết quả mới nhất chạy với cùng cấu hình (kích thước, tỷ lệ từ khóa, concurrency, stack riêng, ...);
+# so với lần chạy khác cấu hình thì chênh lệch không nói lên điều gì
+def latest_results(kind, config=None):
+    for path in sorted(glob.glob(os.path.join(RESULTS_DIR, f"{kind}-*.json")), reverse=True):
+        with open(path, encoding="utf-8") as f:
+            results = json.load(f)
+        if config is None or results.get("config") == config:
+            return results
+    return None
+
+
+# So sánh p95 và throughput từng nhóm với lần chạy trước; trả về danh sách dòng bị chậm đi
+# quá ngưỡng (threshold = 0.2 nghĩa là chậm hơn 20%) hoặc có tỷ lệ lỗi tăng
+def compare(previous, current, threshold):
+    regressions = []
+    for group, categories in current["groups"].items():
+        before_group = previous.get("groups", {}).get(group, {})
+        for category, stats in categories.items():
+            before = before_group.get(category)
+            if not before:
+                continue
+            # Request lỗi thường trả về nhanh nên p95 có thể "tốt lên"; lỗi tăng luôn là hồi quy
+            if stats["error_rate"] > before.get("error_rate", 0):
+                line = (f"{group:>10} {category:<10} tỷ lệ lỗi {before.get('error_rate', 0):.2%} -> "
+                        f"{stats['error_rate']:.2%}")
+                print(line)
+                regressions.append(line)
+            if not before.get("p95_ms") or not stats.get("p95_ms"):
+                continue
+            p95_change = stats["p95_ms"] / before["p95_ms"] - 1
+            rps_change = stats["throughput_rps"] / before["throughput_rps"] - 1 if before["throughput_rps"] else 0
+            line = (f"{group:>10} {category:<10} p95 {before['p95_ms']:.1f} -> {stats['p95_ms']:.1f} ms ({p95_change:+.0%}), "
+                    f"throughput {before['throughput_rps']:.1f} -> {stats['throughput_rps']:.1f} rps ({rps_change:+.0%})")
+            print(line)
+            if p95_change > threshold or rps_change < -threshold:
+                regressions.append(line)
+    return regressions
+
+
+def print_stats(group, stats):
+    for category, s in stats.items():
+        p50 = f"{s['p50_ms']:.1f}" if s["p50_ms"] is not None else "-"
+        p95 = f"{s['p95_ms']:.1f}" if s["p95_ms"] is not None else "-"
+        p99 = f"{s['p99_ms']:.1f}" if s["p99_ms"] is not None else "-"
+        print(f"{group:>10} {category:<10} n={s['requests']:<6} lỗi={s['errors']:<4} "
+              f"p50={p50:>8} p95={p95:>8} p99={p99:>8} ms  {s['throughput_rps']:.1f} rps")
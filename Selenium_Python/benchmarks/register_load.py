@@ -0,0 +1,154 @@
+# Tải và kiểm tra race của POST /v1/auth/register (AuthControllers.register).
+# Chạy từ thư mục Selenium_Python khi app đang chạy:
+#   python -m benchmarks.register_load --users 2000 --concurrency 32 --collision-groups 50
+# Collection users thật được cất sang bên và trả lại khi xong; lần chạy bắt đầu với users rỗng
+# để kiểm tra luôn quy tắc "người đăng ký đầu tiên là admin" khi nhiều request đến cùng lúc.
+import argparse
+import sys
+import threading
+import time
+from collections import Counter
+from pymongo import MongoClient
+from benchmarks.common import (add_stack_arguments, benchmark_stack, compare, latest_results, preserved_collection,
+                               print_stats, run_concurrent, save_results)
+from settings import BASE_URL, DB_NAME, MONGO_URI
+import http_client
+
+COLLISION_FIELDS = ("username", "email", "phone")
+# Mỗi nhóm payload dùng một khoảng số riêng để số điện thoại không vô tình trùng nhau
+NUMBER_BASE = {"first": 0, "unique": 10**6, "shared": 5 * 10**8, "collide": 6 * 10**8}
+
+
+def registration(tag, i):
+    number = NUMBER_BASE[tag] + i
+    return {
+        "username": f"load_{tag}_{i:07d}",
+        "email": f"load_{tag}_{i:07d}@example.com",
+        "password": "password123",
+        "phone": f"0{number:09d}",
+        "address": "Load Test St",
+    }
+
+
+# Payload theo thứ tự gửi: đợt đầu nhiều user khác nhau cùng lúc vào collection rỗng (tranh admin),
+# sau đó user duy nhất xen kẽ các nhóm đụng độ; các request cùng nhóm đứng liền nhau để chạy đồng thời
+def build_payloads(users, collision_groups, collision_size, first_burst):
+    payloads = [("first_admin", registration("first", i)) for i in range(first_burst)]
+    unique = [("unique", registration("unique", i)) for i in range(users)]
+    groups = []
+    for g in range(collision_groups):
+        field = COLLISION_FIELDS[g % len(COLLISION_FIELDS)]
+        shared = registration("shared", g)
+        group = []
+        for i in range(collision_size):
+            form = registration("collide", g * 1000 + i)
+            form[field] = shared[field]
+            group.append((f"collide_{field}", form))
+        groups.append(group)
+    step = max(1, len(unique) // (len(groups) + 1))
+    for index, group in enumerate(groups):
+        position = (index + 1) * step + index * collision_size
+        unique[position:position] = group
+    return payloads + unique
+
+
+def audit(users):
+    report = {"total_users": users.count_documents({}), "admins": users.count_documents({"admin": True}), "duplicates": {}}
+    for field in ("username", "email", "phoneNumber"):
+        duplicates = list(users.aggregate([
+            {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+            {"$match": {"count": {"$gt": 1}}},
+        ]))
+        report["duplicates"][field] = {
+            "values": len(duplicates),
+            "extra_documents": sum(d["count"] - 1 for d in duplicates),
+        }
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tải và kiểm tra race của POST /v1/auth/register")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--mongo-uri", default=MONGO_URI)
+    parser.add_argument("--db-name", default=DB_NAME, help="Database app đang dùng")
+    parser.add_argument("--users", type=int, default=2000, help="Số đăng ký không trùng")
+    parser.add_argument("--collision-groups", type=int, default=30, help="Số nhóm cố ý trùng username/email/phone")
+    parser.add_argument("--collision-size", type=int, default=8, help="Số request đồng thời trong mỗi nhóm trùng")
+    parser.add_argument("--first-burst", type=int, default=16, help="Số đăng ký đồng thời đầu tiên vào collection rỗng")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--regression-threshold", type=float, default=0.2)
+    parser.add_argument("--no-compare", action="store_true")
+    add_stack_arguments(parser)
+    args = parser.parse_args(argv)
+
+    outcomes = Counter()
+    lock = threading.Lock()
+
+    def job(session, form):
+        response = http_client.register(session, base_url=args.base_url, timeout=args.timeout, **form)
+        if response.status_code != 200:
+            outcome = f"http_{response.status_code}"
+        else:
+            page = http_client.parse_page(response.text)
+            outcome = "registered" if page["success_message"] else "rejected"
+        with lock:
+            outcomes[outcome] += 1
+        return response.status_code == 200
+
+    payloads = build_payloads(args.users, args.collision_groups, args.collision_size, args.first_burst)
+    with benchmark_stack(args):
+        client = MongoClient(args.mongo_uri)
+        try:
+            with preserved_collection(client[args.db_name], "users") as users:
+                users.delete_many({})
+                started = time.perf_counter()
+                stats = run_concurrent(job, payloads, args.concurrency)
+                elapsed = time.perf_counter() - started
+                report = audit(users)
+        finally:
+            client.close()
+
+    registrations_per_second = round(outcomes["registered"] / elapsed, 2) if elapsed else 0.0
+    print_stats("register", stats)
+    print(f"Kết quả: {dict(outcomes)}; {registrations_per_second} đăng ký thành công/giây")
+    print(f"Sau khi chạy: {report['total_users']} user, {report['admins']} admin, trùng lặp: {report['duplicates']}")
+
+    problems = []
+    if report["admins"] != 1:
+        problems.append(f"Có {report['admins']} admin (mong đợi đúng 1)")
+    for field, dup in report["duplicates"].items():
+        if dup["extra_documents"]:
+            problems.append(f"{dup['extra_documents']} document trùng {field}")
+    for problem in problems:
+        print(f"RACE: {problem}")
+
+    results = {
+        "config": {"users": args.users, "collision_groups": args.collision_groups,
+                   "collision_size": args.collision_size, "first_burst": args.first_burst,
+                   "concurrency": args.concurrency, "hermetic": args.hermetic,
+                   "mongo_latency_ms": args.mongo_latency_ms},
+        "groups": {"register": stats},
+        "outcomes": dict(outcomes),
+        "registrations_per_second": registrations_per_second,
+        "audit": report,
+        "problems": problems,
+    }
+    previous = None if args.no_compare else latest_results("register", results["config"])
+    path = save_results("register", results)
+    print(f"Đã lưu kết quả: {path}")
+    if not previous and not args.no_compare:
+        print("Chưa có kết quả trước với cùng cấu hình để so sánh")
+    regressions = []
+    if previous:
+        print(f"So sánh với lần chạy {previous.get('created_at')} ({previous.get('revision')}):")
+        regressions = compare(previous, results, args.regression_threshold)
+        if regressions:
+            print(f"Hồi quy (chậm đi quá {args.regression_threshold:.0%} hoặc lỗi tăng):")
+            for line in regressions:
+                print(f"  {line}")
+    return 1 if problems or regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
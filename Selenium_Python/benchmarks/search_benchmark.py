@@ -0,0 +1,141 @@
+# Benchmark độ trễ của GET /search (SiteController.Search) với catalogue tour lớn.
+# Chạy từ thư mục Selenium_Python khi app đang chạy:
+#   python -m benchmarks.search_benchmark --sizes 1000,100000,1000000 --concurrency 16
+# Kết quả lưu ở reports/benchmarks/search-*.json và được so sánh với lần chạy trước.
+import argparse
+import random
+import sys
+import time
+from pymongo import MongoClient
+from benchmarks.common import (add_stack_arguments, benchmark_stack, compare, latest_results, preserved_collection,
+                               print_stats, run_concurrent, save_results)
+from cases import AVAILABLE_TOURS
+from settings import BASE_URL, DB_NAME, MONGO_URI
+import http_client
+
+DESTINATIONS = [tour.rsplit(" ", 4)[0] if "Đêm" in tour else tour.rsplit(" ", 2)[0] for tour in AVAILABLE_TOURS] + [
+    "Hội An", "Đà Lạt", "Côn Đảo", "Cần Thơ", "Vũng Tàu", "Hà Giang", "Mộc Châu", "Phong Nha",
+    "Quy Nhơn", "Buôn Ma Thuột", "Châu Đốc", "Lý Sơn", "Tam Cốc", "Mai Châu", "Điện Biên", "Bến Tre",
+]
+PREFIXES = ["Khám Phá", "Trải Nghiệm", "Nghỉ Dưỡng", "Hành Trình", "Du Lịch", "Về Miền", "Săn Mây", "Ẩm Thực"]
+DURATIONS = ["1 Ngày", "2 Ngày 1 Đêm", "3 Ngày 2 Đêm", "4 Ngày 3 Đêm", "5 Ngày 4 Đêm"]
+LEVELS = ["Easy", "Medium", "Hard"]
+
+# Nhóm từ khóa: trúng, không trúng, rỗng và ký tự đặc biệt (kể cả ký tự regex)
+KEYWORDS = {
+    "hit": ["Hà Nội", "Đà Lạt", "nghỉ dưỡng", "Sapa", "3 Ngày 2 Đêm", "phú quốc", "Hội An"],
+    "miss": ["XYZ", "Paris", "Tokyo 7 Ngày", "không tồn tại"],
+    "empty": [""],
+    "special": ["Hà Nội@#", "%20", ".*", "Huế?", "Sapa (", "[Đà Nẵng", "a+b", "\\"],
+}
+DEFAULT_MIX = "hit=50,miss=25,empty=5,special=20"
+BATCH_SIZE = 10000
+
+
+def generate_tours(count, seed=42):
+    rng = random.Random(seed)
+    for i in range(count):
+        name = f"{rng.choice(PREFIXES)} {rng.choice(DESTINATIONS)} {rng.choice(DURATIONS)} #{i}"
+        yield {
+            "name": name,
+            "description": f"Tour {name}",
+            "image": "/img/i1.png",
+            "videoId": "dQw4w9WgXcQ",
+            "level": rng.choice(LEVELS),
+            "price": rng.randrange(500000, 10000001, 50000),
+            "slug": f"bench-tour-{i}",
+        }
+
+
+def seed_catalogue(collection, size):
+    collection.delete_many({})
+    batch = []
+    for doc in generate_tours(size):
+        batch.append(doc)
+        if len(batch) >= BATCH_SIZE:
+            collection.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        collection.insert_many(batch, ordered=False)
+
+
+def parse_mix(mix):
+    weights = {}
+    for part in mix.split(","):
+        category, weight = part.split("=")
+        if category not in KEYWORDS:
+            raise SystemExit(f"Nhóm từ khóa không hợp lệ: {category} (chọn trong {sorted(KEYWORDS)})")
+        weights[category] = int(weight)
+    return weights
+
+
+def build_payloads(weights, count, seed=7):
+    rng = random.Random(seed)
+    categories = list(weights)
+    picks = rng.choices(categories, weights=[weights[c] for c in categories], k=count)
+    return [(category, rng.choice(KEYWORDS[category])) for category in picks]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark GET /search với catalogue tour lớn")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--mongo-uri", default=MONGO_URI)
+    parser.add_argument("--db-name", default=DB_NAME, help="Database app đang dùng")
+    parser.add_argument("--sizes", default="1000,100000,1000000", help="Các kích thước catalogue, phân cách bằng dấu phẩy")
+    parser.add_argument("--requests", type=int, default=2000, help="Số request đo cho mỗi kích thước")
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--timeout", type=float, default=60.0, help="Timeout mỗi request (giây)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Tỷ lệ các nhóm từ khóa, ví dụ hit=50,miss=25,empty=5,special=20")
+    parser.add_argument("--regression-threshold", type=float, default=0.2)
+    parser.add_argument("--no-compare", action="store_true")
+    add_stack_arguments(parser)
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    weights = parse_mix(args.mix)
+
+    def job(session, keyword):
+        response = http_client.search(session, keyword, base_url=args.base_url, timeout=args.timeout)
+        return response.status_code == 200
+
+    with benchmark_stack(args):
+        client = MongoClient(args.mongo_uri)
+        groups = {}
+        try:
+            with preserved_collection(client[args.db_name], "tours") as tours:
+                for size in sizes:
+                    started = time.perf_counter()
+                    seed_catalogue(tours, size)
+                    print(f"Đã seed {size} tour trong {time.perf_counter() - started:.1f}s")
+                    run_concurrent(job, build_payloads(weights, args.warmup, seed=size), args.concurrency)
+                    stats = run_concurrent(job, build_payloads(weights, args.requests), args.concurrency)
+                    print_stats(str(size), stats)
+                    groups[str(size)] = stats
+        finally:
+            client.close()
+
+    results = {
+        "config": {"sizes": sizes, "requests": args.requests, "concurrency": args.concurrency, "mix": weights,
+                   "hermetic": args.hermetic,
+                   "mongo_latency_ms": args.mongo_latency_ms},
+        "groups": groups,
+    }
+    previous = None if args.no_compare else latest_results("search", results["config"])
+    path = save_results("search", results)
+    print(f"Đã lưu kết quả: {path}")
+    if not previous and not args.no_compare:
+        print("Chưa có kết quả trước với cùng cấu hình để so sánh")
+    if previous:
+        print(f"So sánh với lần chạy {previous.get('created_at')} ({previous.get('revision')}):")
+        regressions = compare(previous, results, args.regression_threshold)
+        if regressions:
+            print(f"Hồi quy (chậm đi quá {args.regression_threshold:.0%} hoặc lỗi tăng):")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
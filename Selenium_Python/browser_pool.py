@@ -0,0 +1,103 @@
+import threading
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from browser_profile import DEFAULT_PROFILE, chrome_options, get_profile, profile_key
+from driver_resolver import resolve_chromedriver
+import settings
+
+
+# Pool WebDriver dùng lại trong một process (mỗi worker xdist có pool riêng).
+# Thay vì quit trình duyệt sau mỗi test, driver được trả về pool sau khi xóa
+# cookie, localStorage/sessionStorage và đưa về trang trắng. Trình duyệt chỉ
+# được dùng lại cho cùng một browser profile.
+class BrowserPool:
+    def __init__(self, max_size=2, factory=None, driver_path=None, offline=False, default_profile=DEFAULT_PROFILE):
+        self.max_size = max_size
+        self.driver_path = driver_path
+        self.offline = offline
+        self.default_profile = default_profile
+        self._factory = factory or self._new_driver
+        self._idle = {}
+        self._keys = {}
+        self._lock = threading.Lock()
+
+    def _new_driver(self, profile):
+        path = resolve_chromedriver(self.driver_path, self.offline)
+        return webdriver.Chrome(service=Service(path), options=chrome_options(profile))
+
+    def acquire(self, profile=None):
+        profile = profile or get_profile(self.default_profile)
+        key = profile_key(profile)
+        evicted = None
+        with self._lock:
+            if self._idle.get(key):
+                return self._idle[key].pop()
+            if len(self._keys) >= self.max_size:
+                evicted = self._pop_idle_locked()
+                if evicted is None:
+                    raise RuntimeError(f"Pool trình duyệt đã đầy ({self.max_size} phiên)")
+                del self._keys[evicted]
+        if evicted is not None:
+            # Nhường chỗ cho profile khác: đóng một phiên đang rảnh
+            self._quit(evicted)
+        driver = self._factory(profile)
+        with self._lock:
+            self._keys[driver] = key
+        return driver
+
+    def _pop_idle_locked(self):
+        for idle in self._idle.values():
+            if idle:
+                return idle.pop()
+        return None
+
+    def release(self, driver):
+        try:
+            reset_driver(driver)
+        except Exception as e:
+            # Phiên hỏng thì bỏ luôn, lần acquire sau sẽ mở phiên mới
+            print(f"Không reset được trình duyệt, đóng phiên: {e}")
+            self.discard(driver)
+            return
+        with self._lock:
+            self._idle.setdefault(self._keys[driver], []).append(driver)
+
+    def drivers(self):
+        with self._lock:
+            return list(self._keys)
+
+    def discard(self, driver):
+        with self._lock:
+            key = self._keys.pop(driver, None)
+            if driver in self._idle.get(key, []):
+                self._idle[key].remove(driver)
+        self._quit(driver)
+
+    @staticmethod
+    def _quit(driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def close(self):
+        for driver in list(self._keys):
+            self.discard(driver)
+
+
+# Xóa trạng thái của phiên trình duyệt để test sau bắt đầu sạch
+def reset_driver(driver, origin=None):
+    origin = origin or settings.BASE_URL
+    if driver.current_url.startswith(origin):
+        driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+    driver.delete_all_cookies()
+    try:
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        driver.execute_cdp_cmd("Storage.clearDataForOrigin", {
+            "origin": origin,
+            "storageTypes": "local_storage,session_storage,indexeddb,cache_storage,service_workers",
+        })
+    except AttributeError:
+        # Driver không phải Chromium, không có CDP
+        pass
+    driver.get("about:blank")
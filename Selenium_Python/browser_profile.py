@@ -0,0 +1,70 @@
+from selenium.webdriver.chrome.options import Options
+
+# Các cấu hình trình duyệt có sẵn:
+# - full: Chrome mặc định có giao diện, tải đầy đủ trang (dùng cho kiểm tra giao diện)
+# - lean: headless, trả về khi DOM sẵn sàng (eager), chặn ảnh, tắt extension/GPU
+# network_timing bật performance log của ChromeDriver (sự kiện mạng) cho --network-timing
+PROFILES = {
+    "full": {
+        "headless": False,
+        "page_load_strategy": "normal",
+        "block_images": False,
+        "disable_extras": False,
+        "network_timing": False,
+    },
+    "lean": {
+        "headless": True,
+        "page_load_strategy": "eager",
+        "block_images": True,
+        "disable_extras": True,
+        "network_timing": False,
+    },
+}
+DEFAULT_PROFILE = "lean"
+PAGE_LOAD_STRATEGIES = ("normal", "eager", "none")
+WINDOW_SIZE = "1366,900"
+
+
+def get_profile(name=DEFAULT_PROFILE, **overrides):
+    if name not in PROFILES:
+        raise ValueError(f"Không có browser profile '{name}', chọn một trong {sorted(PROFILES)}")
+    settings = dict(PROFILES[name], **overrides)
+    unknown = set(settings) - set(PROFILES[name])
+    if unknown:
+        raise ValueError(f"Tùy chọn browser profile không hợp lệ: {sorted(unknown)}")
+    if settings["page_load_strategy"] not in PAGE_LOAD_STRATEGIES:
+        raise ValueError(f"page_load_strategy phải là một trong {PAGE_LOAD_STRATEGIES}")
+    return settings
+
+
+# Khóa để pool chỉ dùng lại trình duyệt được mở với cùng cấu hình
+def profile_key(settings):
+    return tuple(sorted(settings.items()))
+
+
+def chrome_options(settings):
+    options = Options()
+    options.page_load_strategy = settings["page_load_strategy"]
+    if settings["headless"]:
+        options.add_argument("--headless=new")
+        options.add_argument(f"--window-size={WINDOW_SIZE}")
+    if settings["block_images"]:
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    if settings["disable_extras"]:
+        for arg in ("--disable-extensions", "--disable-gpu", "--disable-dev-shm-usage",
+                    "--no-first-run", "--disable-background-networking"):
+            options.add_argument(arg)
+    if settings["network_timing"]:
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    return options
+
+
+# Lấy cấu hình cho test/module từ marker @pytest.mark.browser_profile("full", ...);
+# không có marker thì dùng --browser-profile
+def profile_from_request(request):
+    marker = request.node.get_closest_marker("browser_profile")
+    name = marker.args[0] if marker and marker.args else request.config.getoption("--browser-profile")
+    overrides = dict(marker.kwargs) if marker else {}
+    if request.config.getoption("--network-timing"):
+        overrides["network_timing"] = True
+    return get_profile(name, **overrides)
@@ -0,0 +1,156 @@
+from credential_pool import BCRYPT_ROUNDS, password_hash
+
+# Bảng dữ liệu test dùng chung cho cả tầng Selenium và tầng HTTP (không trình duyệt)
+
+# Danh sách tour có sẵn để tham khảo trong test
+AVAILABLE_TOURS = [
+    "Hà Nội 2 Ngày 1 Đêm",
+    "Sapa 3 Ngày 2 Đêm",
+    "Nha Trang 4 Ngày 3 Đêm",
+    "Đà Nẵng 3 Ngày 2 Đêm",
+    "Phú Quốc 4 Ngày 3 Đêm",
+    "Huế 2 Ngày 1 Đêm",
+    "Cát Bà 3 Ngày 2 Đêm",
+    "Mũi Né 3 Ngày 2 Đêm",
+    "Bình Ba 2 Ngày 1 Đêm",
+    "Hạ Long 1 Ngày",
+    "Ninh Bình 2 Ngày 1 Đêm",
+    "Quảng Bình 3 Ngày 2 Đêm",
+    "Tây Nguyên 4 Ngày 3 Đêm"
+]
+
+LOGIN_PASSWORD = "123456"
+
+# Tài khoản có sẵn trong baseline đăng nhập (mật khẩu LOGIN_PASSWORD)
+LOGIN_USERS = {
+    "admin": {"username": "loginadmin", "email": "loginadmin@example.com", "admin": True, "active": True},
+    "customer": {"username": "logincustomer", "email": "logincustomer@example.com", "admin": False, "active": True},
+    "inactive": {"username": "logininactive", "email": "logininactive@example.com", "admin": False, "active": False},
+}
+
+# Đăng ký: existing là các user có sẵn (username, email, phone), error/success là thông báo mong đợi
+REGISTER_CASES = {
+    "first_user_admin": {
+        "existing": [],
+        "form": {"username": "adminuser", "email": "admin@example.com", "password": "password123", "phone": "0987654321", "address": "456 Admin St"},
+        "success": "bạn đã đăng ký thành công!",
+        "admin": True,
+    },
+    "second_user_customer": {
+        "existing": [("existingadmin", "existingadmin@example.com", "0999888777", True)],
+        "form": {"username": "testuser1", "email": "test1@example.com", "password": "password123", "phone": "0123456789", "address": "123 Test St"},
+        "success": "bạn đã đăng ký thành công!",
+        "admin": False,
+    },
+    "email_exists": {
+        "existing": [("existinguser", "existing@example.com", "0111222333")],
+        "form": {"username": "newuser", "email": "existing@example.com", "password": "password123", "phone": "0222333444", "address": "789 New St"},
+        "error": "email đã được đăng ký.",
+    },
+    "username_exists": {
+        "existing": [("existinguser", "existing@example.com", "0111222333")],
+        "form": {"username": "existinguser", "email": "new@example.com", "password": "password123", "phone": "0222333444", "address": "789 New St"},
+        "error": "tên người dùng đã được sử dụng.",
+    },
+    "phone_exists": {
+        "existing": [("existinguser", "existing@example.com", "0111222333")],
+        "form": {"username": "newuser2", "email": "new2@example.com", "password": "password123", "phone": "0111222333", "address": "789 New St"},
+        "error": "số điện thoại đã được đăng ký.",
+    },
+    "short_username": {
+        "existing": [],
+        "form": {"username": "test", "email": "test3@example.com", "password": "password123", "phone": "0333444555", "address": "321 Test St"},
+        "error": "tên người dùng phải dài ít nhất 6 ký tự.",
+    },
+    # Trùng cả ba trường: thông báo cuối cùng (số điện thoại) được hiển thị
+    "all_fields_exist": {
+        "existing": [("existinguser", "existing@example.com", "0111222333")],
+        "form": {"username": "existinguser", "email": "existing@example.com", "password": "password123", "phone": "0111222333", "address": "789 New St"},
+        "error": "số điện thoại đã được đăng ký.",
+    },
+    # Kiểm tra trùng lặp chạy trước kiểm tra độ dài username
+    "short_username_duplicate_email": {
+        "existing": [("existinguser", "existing@example.com", "0111222333")],
+        "form": {"username": "abc", "email": "existing@example.com", "password": "password123", "phone": "0555666777", "address": "789 New St"},
+        "error": "email đã được đăng ký.",
+    },
+}
+
+# Đăng nhập: user là khóa trong LOGIN_USERS hoặc None để dùng username trong case
+LOGIN_CASES = {
+    "admin_success": {"user": "admin", "password": LOGIN_PASSWORD, "redirect": "/admin/dashboard"},
+    "customer_success": {"user": "customer", "password": LOGIN_PASSWORD, "redirect": "/"},
+    "wrong_username": {"user": None, "username": "wronguser", "password": LOGIN_PASSWORD, "error": "Tên người dùng không tồn tại"},
+    "wrong_password": {"user": "admin", "password": "wrongpass", "error": "Mật khẩu không đúng"},
+    "both_wrong": {"user": None, "username": "wronguser", "password": "wrongpass", "error": "Tên người dùng không tồn tại"},
+    "inactive_account": {"user": "inactive", "password": LOGIN_PASSWORD, "error": "Tài khoản đã bị vô hiệu"},
+}
+
+# Tìm kiếm: expect là các tour phải có trong kết quả, count là số kết quả chính xác
+SEARCH_CASES = {
+    "valid_keyword": {"q": "Hà Nội", "expect": ["Hà Nội 2 Ngày 1 Đêm"]},
+    "invalid_keyword": {"q": "XYZ", "count": 0},
+    "empty_keyword": {"q": "", "count": len(AVAILABLE_TOURS)},
+    "special_characters": {"q": "Hà Nội@#", "count": 0},
+    "case_insensitive": {"q": "hà nội", "expect": ["Hà Nội 2 Ngày 1 Đêm"]},
+    "partial_name": {"q": "3 Ngày 2 Đêm", "count": 5},
+}
+
+
+# Nội dung lỗi (JSON, status 500) app trả về khi không truy vấn được MongoDB
+SERVER_ERRORS = {
+    "register": "Server error",
+    "login": "Server error",
+    "search": "Đã xảy ra lỗi trong quá trình tìm kiếm",
+}
+
+
+def sample_user_doc(username, email, phone_number, admin=False):
+    return {
+        'username': username,
+        'email': email,
+        'password': 'hashed_password',
+        'phoneNumber': phone_number,
+        'address': 'Sample Address',
+        'admin': admin,
+        'active': True
+    }
+
+
+def login_username(case):
+    return LOGIN_USERS[case["user"]]["username"] if case["user"] else case["username"]
+
+
+# Baseline: collection users rỗng (người đăng ký đầu tiên sẽ là admin)
+def build_users_baseline(db):
+    db.create_collection('users')
+
+
+# Cost bcrypt thấp vì chỉ là dữ liệu test (--bcrypt-rounds); hash được cache trong bộ nhớ và trên đĩa
+def login_password_hash(rounds=BCRYPT_ROUNDS):
+    return password_hash(LOGIN_PASSWORD, rounds)
+
+
+def login_user_doc(role, rounds=BCRYPT_ROUNDS):
+    index = list(LOGIN_USERS).index(role)
+    return dict(LOGIN_USERS[role], password=login_password_hash(rounds), phoneNumber=f"09000000{index:02d}",
+                address="Sample Address")
+
+
+# Đảm bảo tài khoản của role tồn tại (collection users có thể vừa bị restore về baseline khác)
+def upsert_login_user(users_collection, role, rounds=BCRYPT_ROUNDS):
+    doc = login_user_doc(role, rounds)
+    users_collection.update_one({'username': doc['username']}, {'$set': doc}, upsert=True)
+
+
+# Baseline: các tài khoản trong LOGIN_USERS
+def build_login_baseline(db, rounds=BCRYPT_ROUNDS):
+    db['users'].insert_many([login_user_doc(role, rounds) for role in LOGIN_USERS])
+
+
+# Baseline: danh sách tour mẫu
+def build_tours_baseline(db):
+    db['tours'].insert_many([
+        {'name': tour, 'level': 'Dễ', 'price': 1000000, 'startDate': '2025-06-01', 'slug': tour.lower().replace(" ", "-")}
+        for tour in AVAILABLE_TOURS
+    ])
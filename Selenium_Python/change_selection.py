@@ -0,0 +1,264 @@
+# Chọn test theo thay đổi: mỗi test khai báo route nó gọi bằng @pytest.mark.routes("/v1/auth/*", "GET /search")
+# (marker ở module và ở hàm được gộp lại),
+# plugin đọc src/routes để biết route đi tới controller/method, middleware, model và view nào.
+# Kết quả passed được lưu kèm dấu vân tay (hash) của các file đó; với --changed-only, test có
+# dấu vân tay không đổi thì dùng lại kết quả cũ, chỉ test bị ảnh hưởng bởi thay đổi trong src/ chạy lại.
+import fnmatch
+import functools
+import glob
+import hashlib
+import os
+import re
+from collections import Counter
+
+ROOT_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+SRC_DIR = os.path.join(ROOT_DIR, "src")
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_PREFIX = "change_selection/"
+
+# Thay đổi ở các file này ảnh hưởng mọi route: khởi tạo app, bảng route gốc, cấu hình DB,
+# layout/partial chung, file tĩnh (JS/CSS trình duyệt chạy) và dependency Node
+GLOBAL_SOURCES = (
+    "src/index.js",
+    "src/routes/index.js",
+    "src/config/**/*",
+    "src/resources/views/users/layouts/**/*",
+    "src/resources/views/users/partials/**/*",
+    "src/public/**/*",
+    "package.json",
+    "package-lock.json",
+)
+
+REQUIRE = re.compile(r"(?:const|let|var)\s+(\w+)\s*=\s*require\(\s*['\"](\.[^'\"]+)['\"]\s*\)")
+MOUNT = re.compile(r"app\.use\(\s*['\"]([^'\"]+)['\"]\s*,\s*(\w+)\s*\)")
+ROUTE = re.compile(r"^[^/\n]*?router\.(get|post|put|delete|patch|all)\(\s*['\"]([^'\"]+)['\"]\s*,([^\n]*)", re.M)
+HANDLER = re.compile(r"\b(\w+)\.(\w+)\b")
+METHOD = re.compile(r"^\s*(?:async\s+)?(\w+)\s*\(\s*req\b", re.M)
+RENDER = re.compile(r"render\(\s*['\"]([^'\"]+)['\"]")
+NOT_METHODS = {"if", "for", "while", "switch", "catch", "return", "function"}
+
+
+def _relative(path):
+    return os.path.relpath(path, ROOT_DIR).replace(os.sep, "/")
+
+
+def _resolve_require(from_file, target):
+    path = os.path.normpath(os.path.join(os.path.dirname(from_file), target))
+    for candidate in (path, path + ".js", os.path.join(path, "index.js")):
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+
+def _read(path):
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+
+def _requires(path):
+    source = _read(path)
+    return {name: _resolve_require(path, target) for name, target in REQUIRE.findall(source)}
+
+
+# Cắt file controller theo method (class method có tham số req). Phần đầu file (require, helper)
+# được tính vào mọi method; thân method kéo dài tới method kế tiếp
+def controller_methods(path):
+    source = _read(path)
+    headers = [(m.start(), m.group(1)) for m in METHOD.finditer(source) if m.group(1) not in NOT_METHODS]
+    if not headers:
+        return {}
+    preamble = source[:headers[0][0]]
+    methods = {}
+    for i, (start, name) in enumerate(headers):
+        end = headers[i + 1][0] if i + 1 < len(headers) else len(source)
+        methods[name] = preamble + source[start:end]
+    return methods
+
+
+# Bảng route của app: path đầy đủ, handler và các nguồn (file hoặc file#method) route phụ thuộc
+@functools.lru_cache(maxsize=None)
+def route_table(src_dir=SRC_DIR):
+    index = os.path.join(src_dir, "routes", "index.js")
+    routers = _requires(index)
+    table = []
+    for prefix, router_name in MOUNT.findall(_read(index)):
+        router_file = routers.get(router_name)
+        if not router_file:
+            continue
+        modules = _requires(router_file)
+        for method, path, rest in ROUTE.findall(_read(router_file)):
+            full_path = (prefix.rstrip("/") + path).rstrip("/") or "/"
+            sources = {_relative(router_file)}
+            handler = None
+            for name in re.findall(r"\b\w+\b", rest):
+                if modules.get(name) and "middlewares" in modules[name]:
+                    sources.add(_relative(modules[name]))
+            for obj, func in HANDLER.findall(rest):
+                controller = modules.get(obj)
+                if not controller:
+                    continue
+                handler = f"{os.path.splitext(os.path.basename(controller))[0]}.{func}"
+                sources.add(f"{_relative(controller)}#{func}")
+                for dependency in _requires(controller).values():
+                    if dependency and "models" in dependency:
+                        sources.add(_relative(dependency))
+                body = controller_methods(controller).get(func, "")
+                for view in RENDER.findall(body):
+                    view_file = os.path.join(src_dir, "resources", "views", view + ".hbs")
+                    if os.path.isfile(view_file):
+                        sources.add(_relative(view_file))
+            table.append({"method": method.upper(), "path": full_path, "handler": handler or _relative(router_file),
+                          "sources": sorted(sources)})
+    return table
+
+
+# Pattern dạng "/v1/auth/*" hoặc "POST /v1/auth/login" (glob trên path đầy đủ của route)
+def match_routes(patterns, table=None):
+    table = route_table() if table is None else table
+    matched = []
+    for pattern in patterns:
+        method, _, path = pattern.rpartition(" ")
+        for route in table:
+            if method and route["method"] != method.upper():
+                continue
+            if fnmatch.fnmatchcase(route["path"], path) and route not in matched:
+                matched.append(route)
+    return matched
+
+
+@functools.lru_cache(maxsize=None)
+def _hash_source(source):
+    path, _, method = source.partition("#")
+    full_path = os.path.join(ROOT_DIR, path)
+    if method:
+        content = controller_methods(full_path).get(method, "").encode("utf-8")
+    else:
+        try:
+            with open(full_path, "rb") as f:
+                content = f.read()
+        except OSError:
+            content = b""
+    return hashlib.sha1(content).hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def global_sources():
+    paths = set()
+    for pattern in GLOBAL_SOURCES:
+        for path in glob.glob(os.path.join(ROOT_DIR, pattern), recursive=True):
+            if os.path.isfile(path):
+                paths.add(_relative(path))
+    # Code Python dùng chung của bộ test (fixture, helper, page object)
+    for path in glob.glob(os.path.join(TESTS_DIR, "*.py")):
+        if not os.path.basename(path).startswith("test_") and not path.endswith("_test.py"):
+            paths.add(_relative(path))
+    return tuple(sorted(paths))
+
+
+# Dấu vân tay của một test: hash từng nguồn nó phụ thuộc (route của test, nguồn chung, file test)
+def fingerprint(item, routes):
+    sources = set(global_sources())
+    sources.add(_relative(str(item.path)))
+    for route in routes:
+        sources.update(route["sources"])
+    return {source: _hash_source(source) for source in sorted(sources)}
+
+
+def _cache_key(nodeid):
+    return CACHE_PREFIX + hashlib.sha1(nodeid.encode("utf-8")).hexdigest()
+
+
+class ChangeSelection:
+    def __init__(self, config):
+        self.config = config
+        self.changed_only = config.getoption("--changed-only") and not config.getoption("--full-run")
+        self.fingerprints = {}
+        self.failed = set()
+        self.reused = []
+        self.changed = Counter()
+        self.routes = {}
+
+    def collect(self, items):
+        selected = []
+        for item in items:
+            # Gộp marker ở mọi cấp (module, class, hàm)
+            patterns = [pattern for marker in item.iter_markers("routes") for pattern in marker.args]
+            routes = match_routes(patterns)
+            self.routes[item.nodeid] = routes
+            if not routes:
+                # Không biết test gọi route nào thì luôn chạy
+                selected.append(item)
+                continue
+            current = fingerprint(item, routes)
+            self.fingerprints[item.nodeid] = current
+            cached = self.config.cache.get(_cache_key(item.nodeid), None)
+            if self.changed_only and cached and cached.get("outcome") == "passed" and cached.get("sources") == current:
+                self.reused.append(item)
+                continue
+            if self.changed_only and cached:
+                for source, digest in current.items():
+                    if cached.get("sources", {}).get(source) != digest:
+                        self.changed[source] += 1
+            selected.append(item)
+        if self.reused:
+            self.config.hook.pytest_deselected(items=self.reused)
+            items[:] = selected
+
+    # Lưu kết quả sau teardown: chỉ test passed ở mọi phase mới được dùng lại (skip cũng chạy lại)
+    def record(self, report):
+        current = self.fingerprints.get(report.nodeid)
+        if current is None:
+            return
+        if report.outcome != "passed":
+            self.failed.add(report.nodeid)
+        if report.when == "teardown":
+            outcome = "failed" if report.nodeid in self.failed else "passed"
+            self.config.cache.set(_cache_key(report.nodeid), {"outcome": outcome, "sources": current})
+
+
+selection = None
+
+
+def pytest_addoption(parser):
+    parser.addoption("--changed-only", action="store_true", default=False,
+                     help="Chỉ chạy test bị ảnh hưởng bởi thay đổi trong src/ (test khác dùng lại kết quả passed đã lưu)")
+    parser.addoption("--full-run", action="store_true", default=os.environ.get("FULL_RUN") == "1",
+                     help="Chạy toàn bộ test, bỏ qua --changed-only (kết quả lưu vẫn được cập nhật)")
+    parser.addoption("--show-routes", action="store_true", default=False,
+                     help="In route, handler mà mỗi test phụ thuộc")
+
+
+def pytest_configure(config):
+    global selection
+    # Cần cache của pytest để lưu kết quả (tắt khi chạy với -p no:cacheprovider)
+    if getattr(config, "cache", None) is not None:
+        selection = ChangeSelection(config)
+
+
+def pytest_collection_modifyitems(config, items):
+    if selection is not None:
+        selection.collect(items)
+
+
+def pytest_runtest_logreport(report):
+    if selection is not None:
+        selection.record(report)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    # Khi chạy song song, việc chọn test diễn ra trong worker; process chính không có số liệu
+    if selection is None or os.environ.get("PYTEST_XDIST_WORKER") or not selection.routes:
+        return
+    if config.getoption("--show-routes"):
+        terminalreporter.section("Route của từng test")
+        for nodeid, routes in selection.routes.items():
+            handlers = ", ".join(f"{r['method']} {r['path']} -> {r['handler']}" for r in routes)
+            terminalreporter.write_line(f"{nodeid}: {handlers or 'không khai báo route (luôn chạy)'}")
+    if config.getoption("--changed-only"):
+        terminalreporter.section("Chọn test theo thay đổi")
+        if config.getoption("--full-run"):
+            terminalreporter.write_line("--full-run: đã chạy toàn bộ test")
+            return
+        terminalreporter.write_line(f"Dùng lại kết quả passed của {len(selection.reused)} test không bị ảnh hưởng")
+        for source, count in selection.changed.most_common():
+            terminalreporter.write_line(f"  {source} thay đổi -> chạy lại {count} test")
@@ -0,0 +1,234 @@
+import os
+import pytest
+from pymongo import MongoClient
+import settings
+from app_stack import HermeticStack
+from browser_pool import BrowserPool
+from browser_profile import DEFAULT_PROFILE, PROFILES, profile_from_request
+from cases import (LOGIN_PASSWORD, LOGIN_USERS, build_login_baseline, build_tours_baseline,
+                   build_users_baseline, upsert_login_user)
+from credential_pool import BCRYPT_ROUNDS, CredentialPool, bcrypt_rounds
+from db_fixtures import SnapshotManager
+from fault_proxy import RemoteFaultProxy, parse_address
+from http_client import new_session
+from session_broker import SessionBroker
+
+pytest_plugins = ["timing_plugin", "change_selection", "network_timing", "soak"]
+
+
+def pytest_addoption(parser):
+    parser.addoption("--browser-pool-size", type=int, default=2,
+                     help="Số phiên Chrome tối đa mỗi worker giữ lại để dùng lại")
+    parser.addoption("--chromedriver", default=None,
+                     help="Đường dẫn chromedriver có sẵn (bỏ qua bước tìm/tải driver)")
+    parser.addoption("--driver-offline", action="store_true", default=False,
+                     help="Không truy cập mạng khi tìm chromedriver, chỉ dùng cache cục bộ")
+    parser.addoption("--browser-profile", default=DEFAULT_PROFILE, choices=sorted(PROFILES),
+                     help="Cấu hình trình duyệt mặc định cho các module không có marker browser_profile")
+    parser.addoption("--pool-admins", type=int, default=5,
+                     help="Số tài khoản admin sinh sẵn trong credential pool")
+    parser.addoption("--pool-customers", type=int, default=20,
+                     help="Số tài khoản customer sinh sẵn trong credential pool")
+    parser.addoption("--bcrypt-rounds", type=bcrypt_rounds, default=BCRYPT_ROUNDS,
+                     help="Cost bcrypt khi hash mật khẩu cho dữ liệu test (tối thiểu 4)")
+    parser.addoption("--mongo-proxy-control", default=os.environ.get("MONGO_PROXY_CONTROL"),
+                     help="Cổng điều khiển của fault_proxy.py (host:port) mà app đang dùng để kết nối MongoDB")
+    parser.addoption("--hermetic", action="store_true", default=os.environ.get("HERMETIC") == "1",
+                     help="Mỗi worker tự chạy mongod tạm (tmpfs) và app trên cổng trống thay vì dùng app có sẵn")
+    parser.addoption("--mongod", default=os.environ.get("MONGOD", "mongod"),
+                     help="Đường dẫn mongod dùng cho --hermetic")
+    parser.addoption("--node", default=os.environ.get("NODE", "node"),
+                     help="Đường dẫn node dùng cho --hermetic")
+    parser.addoption("--stack-tmpdir", default=None,
+                     help="Thư mục chứa dữ liệu mongod của --hermetic (mặc định /dev/shm nếu có)")
+    parser.addoption("--soak-cycles", type=int, default=0,
+                     help="Số chu kỳ đăng nhập -> xem trang -> tìm kiếm -> đăng xuất của test_soak.py (0: bỏ qua)")
+    parser.addoption("--soak-sample-every", type=int, default=10,
+                     help="Lấy mẫu RSS/handle/kết nối MongoDB sau mỗi N chu kỳ soak")
+    parser.addoption("--app-pid", type=int, default=None,
+                     help="PID process Node của app để đo khi soak (mặc định tìm theo cổng của BASE_URL)")
+
+
+# Khi chạy song song (-n), gom test theo xdist_group để các module dùng chung
+# dữ liệu (và thứ tự @pytest.mark.order) chạy trên cùng một worker
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    config.addinivalue_line("markers", "search: mark test for search functionality")
+    config.addinivalue_line("markers", "order: mark test to run in specific order")
+    config.addinivalue_line("markers", "xdist_group(name): chạy các test cùng nhóm trên một worker")
+    config.addinivalue_line("markers", "routes(*patterns): route của app mà test gọi, ví dụ \"/v1/auth/*\" hoặc "
+                                       "\"GET /search\" (dùng cho --changed-only)")
+    config.addinivalue_line("markers", "soak: chạy lặp lâu để theo dõi bộ nhớ/handle tăng dần (--soak-cycles)")
+    config.addinivalue_line("markers", "http: tầng test nhanh gọi thẳng HTTP, không dùng trình duyệt")
+    config.addinivalue_line("markers", "signed_in(role): driver đã đăng nhập sẵn bằng cookie phiên của role (admin/customer)")
+    config.addinivalue_line("markers", "browser_profile(name, **overrides): chọn cấu hình trình duyệt "
+                                       "(lean/full, headless, page_load_strategy, block_images, disable_extras, network_timing)")
+    if getattr(config.option, "numprocesses", None) and config.option.dist in ("no", "load"):
+        config.option.dist = "loadgroup"
+
+
+# App và MongoDB mà test dùng: mặc định là stack có sẵn theo settings (biến môi trường BASE_URL,
+# MONGO_URI, DB_NAME); với --hermetic mỗi worker dựng stack riêng và trỏ settings sang đó.
+# autouse để stack sẵn sàng trước mọi fixture khác của phiên
+@pytest.fixture(scope="session", autouse=True)
+def app_stack(request):
+    if not request.config.getoption("--hermetic"):
+        yield None
+        return
+    stack = HermeticStack(mongod=request.config.getoption("--mongod"),
+                          node=request.config.getoption("--node"),
+                          db_name=settings.DB_NAME,
+                          tmpdir=request.config.getoption("--stack-tmpdir"),
+                          name=os.environ.get("PYTEST_XDIST_WORKER", "main"))
+    try:
+        stack.start()
+        error = None
+    except RuntimeError as e:
+        error = str(e)
+    if error:
+        pytest.fail(f"Không dựng được stack riêng: {error}", pytrace=False)
+    previous = settings.BASE_URL, settings.MONGO_URI
+    settings.BASE_URL, settings.MONGO_URI = stack.base_url, stack.mongo_uri
+    yield stack
+    settings.BASE_URL, settings.MONGO_URI = previous
+    stack.stop()
+
+
+# Pool trình duyệt cho cả phiên test; mỗi worker xdist là một process nên có pool riêng
+@pytest.fixture(scope="session")
+def browser_pool(request):
+    pool = BrowserPool(max_size=request.config.getoption("--browser-pool-size"),
+                       driver_path=request.config.getoption("--chromedriver"),
+                       offline=request.config.getoption("--driver-offline"),
+                       default_profile=request.config.getoption("--browser-profile"))
+    yield pool
+    pool.close()
+
+
+# Lấy một trình duyệt từ pool cho từng test, trả lại (đã reset) khi test xong
+@pytest.fixture
+def pooled_driver(request, browser_pool):
+    driver = browser_pool.acquire(profile_from_request(request))
+    yield driver
+    browser_pool.release(driver)
+
+
+# Kết nối MongoDB dùng chung cho cả phiên test
+@pytest.fixture(scope="session")
+def mongo_client(app_stack):
+    client = MongoClient(settings.MONGO_URI, serverSelectionTimeoutMS=5000)
+    yield client
+    client.close()
+
+
+@pytest.fixture(scope="session")
+def test_db(app_stack, mongo_client):
+    # Test luôn dùng đúng database của app; muốn mỗi worker xdist một database riêng thì chạy với
+    # --hermetic (mỗi worker có mongod và app riêng)
+    return mongo_client[settings.DB_NAME]
+
+
+# Baseline dữ liệu dựng một lần mỗi phiên, restore giữa các test bằng renameCollection
+@pytest.fixture(scope="session")
+def db_snapshots(app_stack, test_db):
+    manager = SnapshotManager(test_db, throwaway=bool(app_stack))
+    yield manager
+    manager.close()
+
+
+@pytest.fixture(scope="session")
+def users_snapshot(db_snapshots):
+    return db_snapshots.get('users_empty', build_users_baseline)
+
+
+@pytest.fixture(scope="session")
+def login_snapshot(request, db_snapshots):
+    rounds = request.config.getoption("--bcrypt-rounds")
+    return db_snapshots.get('login_users', lambda db: build_login_baseline(db, rounds))
+
+
+@pytest.fixture(scope="session")
+def tours_snapshot(db_snapshots):
+    return db_snapshots.get('tours_catalogue', build_tours_baseline)
+
+
+# Tài khoản sinh sẵn: mật khẩu hash một lần (cache trên đĩa), insert theo lô vào baseline
+@pytest.fixture(scope="session")
+def credential_pool(request, db_snapshots):
+    pool = CredentialPool(LOGIN_PASSWORD,
+                          admins=request.config.getoption("--pool-admins"),
+                          customers=request.config.getoption("--pool-customers"),
+                          rounds=request.config.getoption("--bcrypt-rounds"))
+    pool.snapshot = db_snapshots.get('credential_pool', pool.build_baseline)
+    return pool
+
+
+# Mỗi test bắt đầu với users = baseline của pool; tài khoản lấy độc quyền được trả lại khi test xong
+@pytest.fixture
+def credentials(credential_pool):
+    credential_pool.snapshot.restore()
+    yield credential_pool
+    credential_pool.release_all()
+
+
+# Proxy gây lỗi giữa app và MongoDB (xem fault_proxy.py). Với --hermetic, app chỉ được khởi động lại
+# sau proxy trong lúc test cần và trở về kết nối thẳng khi test xong, để các test khác (ngân sách
+# thời gian, soak) không đo thêm chặng proxy. Ngoài ra test lỗi kết nối bị bỏ qua khi app không chạy
+# qua proxy vì không có cách nào khác làm app mất kết nối thật
+@pytest.fixture
+def mongo_proxy(request, app_stack):
+    if app_stack:
+        app_stack.use_proxy(True)
+        app_stack.proxy.heal()
+        yield app_stack.proxy
+        app_stack.proxy.heal()
+        app_stack.use_proxy(False)
+        return
+    control = request.config.getoption("--mongo-proxy-control")
+    if not control:
+        pytest.skip("Cần --mongo-proxy-control: chạy app qua fault_proxy.py để kiểm tra lỗi kết nối MongoDB")
+    proxy = RemoteFaultProxy(parse_address(control))
+    try:
+        stats = proxy.stats()
+    except OSError as e:
+        pytest.skip(f"Không kết nối được cổng điều khiển proxy {control}: {e}")
+    if not stats["active"]:
+        pytest.skip("App không kết nối MongoDB qua proxy (kiểm tra MONGODB_URI của app)")
+    proxy.heal()
+    yield proxy
+    proxy.heal()
+
+
+# Session HTTP dùng chung (giữ kết nối) cho tầng test không trình duyệt
+@pytest.fixture(scope="session")
+def http_session():
+    session = new_session()
+    yield session
+    session.close()
+
+
+# Mỗi test bắt đầu với cookie trống nhưng vẫn dùng lại kết nối của session
+@pytest.fixture
+def http(http_session):
+    http_session.cookies.clear()
+    return http_session
+
+
+# Cookie đăng nhập của từng role, đăng nhập qua HTTP một lần cho cả phiên test
+@pytest.fixture(scope="session")
+def session_broker(request, test_db):
+    rounds = request.config.getoption("--bcrypt-rounds")
+    accounts = {role: (user["username"], LOGIN_PASSWORD) for role, user in LOGIN_USERS.items()}
+    broker = SessionBroker(accounts, ensure_account=lambda role: upsert_login_user(test_db['users'], role, rounds))
+    yield broker
+    broker.close()
+
+
+# Trình duyệt đã đăng nhập sẵn: role lấy từ @pytest.mark.signed_in("admin"), mặc định customer.
+# Dùng cho các trang cần đăng nhập (giỏ hàng, thanh toán, profile, admin); riêng
+# luồng đăng nhập qua giao diện vẫn được kiểm tra trong test_login.py
+@pytest.fixture
+def signed_in_driver(request, pooled_driver, session_broker):
+    marker = request.node.get_closest_marker("signed_in")
+    role = marker.args[0] if marker else "customer"
+    return session_broker.authenticate(pooled_driver, role)
@@ -0,0 +1,129 @@
+import argparse
+import hashlib
+import itertools
+import os
+import threading
+from collections import deque
+import bcrypt
+from disk_cache import CACHE_DIR as DEFAULT_CACHE_DIR, load_cache, save_cache
+
+# Cost bcrypt cho dữ liệu test (4 là mức thấp nhất bcrypt cho phép; app dùng mặc định 10)
+BCRYPT_ROUNDS = int(os.environ.get("TEST_BCRYPT_ROUNDS", "4"))
+MIN_BCRYPT_ROUNDS, MAX_BCRYPT_ROUNDS = 4, 31
+CACHE_DIR = os.environ.get("CREDENTIAL_CACHE_DIR", DEFAULT_CACHE_DIR)
+CACHE_FILE = "bcrypt-hashes.json"
+ROLES = ("admin", "customer")
+BATCH_SIZE = 1000
+
+_hashes = {}
+_hash_lock = threading.Lock()
+
+
+# Kiểu cho tùy chọn --bcrypt-rounds: bcrypt chỉ chấp nhận cost trong khoảng 4..31
+def bcrypt_rounds(value):
+    rounds = int(value)
+    if not MIN_BCRYPT_ROUNDS <= rounds <= MAX_BCRYPT_ROUNDS:
+        raise argparse.ArgumentTypeError(
+            f"cost bcrypt phải trong khoảng {MIN_BCRYPT_ROUNDS}..{MAX_BCRYPT_ROUNDS}, nhận {value}")
+    return rounds
+
+
+# Mỗi (mật khẩu, cost) chỉ hash một lần: giữ trong bộ nhớ và lưu xuống đĩa cho các lần chạy sau.
+# Hash bcrypt chứa sẵn salt nên một hash dùng được cho mọi tài khoản có cùng mật khẩu
+def password_hash(password, rounds=BCRYPT_ROUNDS, cache_dir=CACHE_DIR):
+    # Khóa cache là SHA-256 của mật khẩu, không ghi mật khẩu dạng rõ xuống đĩa
+    key = f"{rounds}:{hashlib.sha256(password.encode('utf-8')).hexdigest()}"
+    with _hash_lock:
+        if key in _hashes:
+            return _hashes[key]
+        cache = load_cache(cache_dir, CACHE_FILE)
+        hashed = cache.get(key)
+        if not hashed:
+            hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+            cache[key] = hashed
+            try:
+                save_cache(cache_dir, CACHE_FILE, cache)
+            except OSError:
+                pass
+        _hashes[key] = hashed
+        return hashed
+
+
+# Kho tài khoản admin/customer sinh sẵn cho test đăng nhập và test tải.
+# Tài khoản được insert theo lô vào baseline (restore bằng Snapshot), sau đó phát cho test
+# theo vòng (take) hoặc độc quyền trong một test (take(exclusive=True), trả lại bằng release_all)
+class CredentialPool:
+    def __init__(self, password, admins=5, customers=20, rounds=BCRYPT_ROUNDS, batch_size=BATCH_SIZE, prefix=None):
+        self.password = password
+        self.counts = {"admin": admins, "customer": customers}
+        self.rounds = rounds
+        self.batch_size = batch_size
+        # Tách tên theo worker xdist để các worker dùng chung database không phát trùng tài khoản
+        worker_id = os.environ.get("PYTEST_XDIST_WORKER", "main")
+        self.prefix = prefix or f"pool_{worker_id}"
+        self.usernames = {role: [self.username(role, i) for i in range(count)] for role, count in self.counts.items()}
+        self._cycles = {role: itertools.cycle(names) for role, names in self.usernames.items() if names}
+        self._free = {role: deque(names) for role, names in self.usernames.items()}
+        self._leased = {}
+        self._lock = threading.Lock()
+
+    def username(self, role, i):
+        return f"{self.prefix}_{role}_{i:05d}"
+
+    def documents(self, role):
+        hashed = password_hash(self.password, self.rounds)
+        offset = ROLES.index(role) * 10**6
+        for i, username in enumerate(self.usernames[role]):
+            yield {
+                'username': username,
+                'email': f"{username}@example.com",
+                'password': hashed,
+                'phoneNumber': f"07{offset + i:08d}",
+                'address': 'Sample Address',
+                'admin': role == "admin",
+                'active': True,
+            }
+
+    # Insert toàn bộ tài khoản của pool theo lô vào collection users
+    def seed(self, users_collection):
+        users_collection.delete_many({'username': {'$regex': f"^{self.prefix}_"}})
+        for role in ROLES:
+            batch = []
+            for doc in self.documents(role):
+                batch.append(doc)
+                if len(batch) >= self.batch_size:
+                    users_collection.insert_many(batch, ordered=False)
+                    batch = []
+            if batch:
+                users_collection.insert_many(batch, ordered=False)
+
+    # Builder cho SnapshotManager.get
+    def build_baseline(self, db):
+        self.seed(db['users'])
+
+    def take(self, role="customer", exclusive=False):
+        if role not in self.counts:
+            raise ValueError(f"Role không hợp lệ: {role} (chọn trong {', '.join(ROLES)})")
+        with self._lock:
+            if not exclusive:
+                if role not in self._cycles:
+                    raise RuntimeError(f"Pool không có tài khoản {role}")
+                return next(self._cycles[role]), self.password
+            if not self._free[role]:
+                raise RuntimeError(f"Hết tài khoản {role} độc quyền trong pool "
+                                   f"({self.counts[role]} tài khoản), tăng kích thước pool")
+            username = self._free[role].popleft()
+            self._leased[username] = role
+            return username, self.password
+
+    def release(self, username):
+        with self._lock:
+            role = self._leased.pop(username, None)
+            if role:
+                self._free[role].append(username)
+
+    def release_all(self):
+        with self._lock:
+            for username, role in self._leased.items():
+                self._free[role].append(username)
+            self._leased.clear()
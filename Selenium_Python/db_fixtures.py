@@ -0,0 +1,131 @@
+import threading
+from pymongo.errors import CollectionInvalid
+
+STAGING_PREFIX = "__restore_"
+SAVED_PREFIX = "__saved_"
+
+
+def copy_indexes(source, target):
+    for name, info in source.index_information().items():
+        if name == "_id_":
+            continue
+        keys = info.pop("key")
+        for field in ("v", "ns"):
+            info.pop(field, None)
+        target.create_index(keys, name=name, **info)
+
+
+# Baseline được dựng một lần vào database mẫu (<db>__baseline_<name>). Mỗi collection
+# luôn có sẵn một bản sao dự phòng (__restore_<name>_<coll>) trong database test;
+# restore chỉ là renameCollection (thao tác metadata, không phụ thuộc số document),
+# sau đó bản sao mới được tạo nền. Index được lấy từ collection thật (hoặc bản gốc đã cất)
+class Snapshot:
+    def __init__(self, db, name, builder):
+        self.db = db
+        self.name = name
+        self.template = db.client[f"{db.name}__baseline_{name}"]
+        db.client.drop_database(self.template.name)
+        builder(self.template)
+        self.collections = self.template.list_collection_names()
+        self._refills = {}
+        existing = db.list_collection_names()
+        for coll in self.collections:
+            for source in (SAVED_PREFIX + coll, coll):
+                if source in existing:
+                    copy_indexes(db[source], self.template[coll])
+                    break
+            self._start_refill(coll)
+
+    def _staging_name(self, coll):
+        return f"{STAGING_PREFIX}{self.name}_{coll}"
+
+    def _clone(self, coll):
+        staging = self.db[self._staging_name(coll)]
+        staging.drop()
+        self.template[coll].aggregate([{"$out": {"db": self.db.name, "coll": staging.name}}])
+        try:
+            self.db.create_collection(staging.name)
+        except CollectionInvalid:
+            pass
+        copy_indexes(self.template[coll], staging)
+
+    def _start_refill(self, coll):
+        result = {}
+
+        def run():
+            try:
+                self._clone(coll)
+            except Exception as e:
+                result["error"] = e
+
+        thread = threading.Thread(target=run, name=f"refill-{self.name}-{coll}", daemon=True)
+        thread.start()
+        self._refills[coll] = (thread, result)
+
+    def _wait_refill(self, coll):
+        thread, result = self._refills.pop(coll)
+        thread.join()
+        if "error" in result:
+            raise result["error"]
+
+    def restore(self):
+        for coll in self.collections:
+            self._wait_refill(coll)
+            self.db[self._staging_name(coll)].rename(coll, dropTarget=True)
+            self._start_refill(coll)
+
+    def drop(self):
+        for coll in list(self._refills):
+            try:
+                self._wait_refill(coll)
+            except Exception:
+                pass
+            self.db[self._staging_name(coll)].drop()
+        self.db.client.drop_database(self.template.name)
+
+
+# Quản lý các baseline trong một phiên test. Với database dùng chung, dữ liệu gốc của
+# collection được cất sang __saved_<coll> trước lần restore đầu tiên và trả lại khi
+# kết thúc phiên; database của stack riêng (--hermetic, mongod tạm của từng worker) thì bị xóa hẳn
+class SnapshotManager:
+    def __init__(self, db, throwaway=False):
+        self.db = db
+        self.throwaway = throwaway
+        self._snapshots = {}
+        self._saved = {}
+
+    def get(self, name, builder):
+        if name not in self._snapshots:
+            snapshot = Snapshot(self.db, name, builder)
+            for coll in snapshot.collections:
+                self._save_original(coll)
+            self._snapshots[name] = snapshot
+        return self._snapshots[name]
+
+    def restore(self, name):
+        self._snapshots[name].restore()
+
+    def _save_original(self, coll):
+        if self.throwaway or coll in self._saved:
+            return
+        existing = self.db.list_collection_names()
+        if SAVED_PREFIX + coll in existing:
+            # Lần chạy trước bị dừng giữa chừng: giữ bản gốc đã cất từ trước
+            self._saved[coll] = True
+        elif coll in existing:
+            self.db[coll].rename(SAVED_PREFIX + coll)
+            self._saved[coll] = True
+        else:
+            self._saved[coll] = False
+
+    def close(self):
+        for snapshot in self._snapshots.values():
+            snapshot.drop()
+        if self.throwaway:
+            self.db.client.drop_database(self.db.name)
+            return
+        for coll, had_original in self._saved.items():
+            if had_original:
+                self.db[SAVED_PREFIX + coll].rename(coll, dropTarget=True)
+            else:
+                self.db[coll].drop()
@@ -0,0 +1,24 @@
+import json
+import os
+import tempfile
+
+# Cache JSON nhỏ trên đĩa dùng lại giữa các lần chạy (hash bcrypt của credential_pool.py,
+# đường dẫn chromedriver của driver_resolver.py). Mỗi module có file riêng trong cùng thư mục
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ttravel-selenium")
+
+
+def load_cache(cache_dir, filename):
+    try:
+        with open(os.path.join(cache_dir, filename), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+# Ghi ra file tạm rồi đổi tên để các worker chạy song song không đọc phải file ghi dở
+def save_cache(cache_dir, filename, cache):
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(cache, f, indent=2)
+    os.replace(tmp_path, os.path.join(cache_dir, filename))
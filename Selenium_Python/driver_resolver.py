@@ -0,0 +1,80 @@
+import functools
+import glob
+import os
+from webdriver_manager.chrome import ChromeDriverManager
+from webdriver_manager.core.os_manager import OperationSystemManager, ChromeType
+from disk_cache import CACHE_DIR as DEFAULT_CACHE_DIR, load_cache, save_cache
+
+# Thư mục lưu bảng ánh xạ "phiên bản Chrome -> đường dẫn chromedriver" giữa các lần chạy
+CACHE_DIR = os.environ.get("CHROMEDRIVER_CACHE_DIR", DEFAULT_CACHE_DIR)
+CACHE_FILE = "chromedriver.json"
+DRIVER_NAMES = ("chromedriver", "chromedriver.exe")
+
+# Các thư mục cache cục bộ có sẵn: webdriver-manager (kể cả thư mục riêng của worker xdist)
+# và Selenium Manager
+LOCAL_CACHE_PATTERNS = (
+    os.path.join(os.path.expanduser("~"), ".wdm", "**", "chromedriver", "*", "{major}.*", "**", "{name}"),
+    os.path.join(os.path.expanduser("~"), ".cache", "selenium", "chromedriver", "*", "{major}.*", "{name}"),
+)
+
+
+def installed_chrome_version():
+    for browser in (ChromeType.GOOGLE, ChromeType.CHROMIUM):
+        try:
+            version = OperationSystemManager().get_browser_version_from_os(browser)
+        except Exception:
+            version = None
+        if version:
+            return version
+    return None
+
+
+def _major(version):
+    return version.split(".")[0] if version else "unknown"
+
+
+# Phiên bản trong thư mục cache (vd. .../114.0.5735.198/...) dạng tuple số để so sánh đúng thứ tự
+# (so chuỗi thì 114.0.5735.90 lại lớn hơn 114.0.5735.198)
+def _cached_version(path, major):
+    for part in reversed(os.path.normpath(path).split(os.sep)):
+        pieces = part.split(".")
+        if pieces[0] == str(major) and all(piece.isdigit() for piece in pieces):
+            return tuple(int(piece) for piece in pieces)
+    return ()
+
+
+def _scan_local_cache(major):
+    for pattern in LOCAL_CACHE_PATTERNS:
+        for name in DRIVER_NAMES:
+            matches = glob.glob(pattern.format(major=major, name=name), recursive=True)
+            if matches:
+                return max(matches, key=lambda path: _cached_version(path, major))
+    return None
+
+
+# Tìm chromedriver một lần cho mỗi process. Thứ tự ưu tiên: đường dẫn chỉ định
+# (tham số hoặc biến môi trường CHROMEDRIVER_PATH) -> cache theo phiên bản Chrome
+# -> cache cục bộ của webdriver-manager/Selenium Manager -> tải qua mạng (trừ khi offline)
+@functools.lru_cache(maxsize=None)
+def resolve_chromedriver(explicit_path=None, offline=False, cache_dir=CACHE_DIR):
+    explicit_path = explicit_path or os.environ.get("CHROMEDRIVER_PATH")
+    if explicit_path:
+        if not os.path.isfile(explicit_path):
+            raise FileNotFoundError(f"Không tìm thấy chromedriver tại {explicit_path}")
+        return explicit_path
+
+    major = _major(installed_chrome_version())
+    cache = load_cache(cache_dir, CACHE_FILE)
+    path = cache.get(major)
+    if path and os.path.isfile(path):
+        return path
+
+    path = _scan_local_cache(major)
+    if not path:
+        if offline:
+            raise RuntimeError(f"Chế độ offline: không có chromedriver cho Chrome {major} trong cache, "
+                               f"hãy chỉ định --chromedriver hoặc CHROMEDRIVER_PATH")
+        path = ChromeDriverManager().install()
+    cache[major] = path
+    save_cache(cache_dir, CACHE_FILE, cache)
+    return path
@@ -0,0 +1,261 @@
+# Proxy TCP đặt giữa app Node và mongod để test điều khiển lỗi kết nối MongoDB:
+# drop (cắt mọi kết nối, từ chối kết nối mới), stall (giữ kết nối nhưng ngừng chuyển dữ liệu)
+# và latency (trễ thêm N ms cho mỗi gói app gửi tới mongod).
+# Chạy riêng trước khi khởi động app:
+#   python fault_proxy.py --listen 127.0.0.1:27018 --target 127.0.0.1:27017 --control 127.0.0.1:27019
+#   MONGODB_URI="mongodb://127.0.0.1:27018/travel?serverSelectionTimeoutMS=3000" npm start
+#   pytest --mongo-proxy-control 127.0.0.1:27019
+import argparse
+import json
+import socket
+import struct
+import threading
+import time
+from contextlib import contextmanager
+
+MODES = ("pass", "drop", "stall")
+BUFFER_SIZE = 65536
+# Thời gian chờ tối đa để app trả lỗi khi mất MongoDB (app nên dùng serverSelectionTimeoutMS
+# ngắn trong MONGODB_URI, mặc định của driver là 30 giây)
+FAILURE_TIMEOUT = 45
+
+
+def parse_address(value, default_host="127.0.0.1"):
+    host, _, port = value.rpartition(":")
+    return host or default_host, int(port)
+
+
+# shutdown trước close: thread pump chiều ngược lại có thể đang chờ recv trên cùng socket, khi đó close()
+# không thật sự đóng kết nối (và không đánh thức thread đó), kết nối sẽ treo thay vì bị cắt
+def _close(sock):
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+    try:
+        sock.close()
+    except OSError:
+        pass
+
+
+def _reset(sock):
+    # SO_LINGER = 0: đóng bằng RST để phía app thấy lỗi kết nối ngay, không chờ FIN
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+    except OSError:
+        pass
+    _close(sock)
+
+
+class _FaultControls:
+    def drop(self):
+        self.set_mode("drop")
+
+    def stall(self):
+        self.set_mode("stall")
+
+    def heal(self):
+        self.set_mode("pass")
+        self.set_latency(0)
+
+    # Gây lỗi trong phạm vi khối with, sau đó trả proxy về trạng thái bình thường
+    @contextmanager
+    def fault(self, mode="drop", latency_ms=0):
+        if mode not in MODES:
+            raise ValueError(f"Chế độ không hợp lệ: {mode} (chọn trong {', '.join(MODES)})")
+        self.set_latency(latency_ms)
+        self.set_mode(mode)
+        try:
+            yield self
+        finally:
+            self.heal()
+
+
+class FaultProxy(_FaultControls):
+    def __init__(self, target=("127.0.0.1", 27017), listen=("127.0.0.1", 0)):
+        self.target = target
+        self.mode = "pass"
+        self.latency_ms = 0
+        self.connections = 0
+        self.bytes_up = 0
+        self.bytes_down = 0
+        self._listen = listen
+        self._server = None
+        self._flowing = threading.Event()
+        self._flowing.set()
+        self._sockets = set()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @property
+    def address(self):
+        return self._server.getsockname()[:2]
+
+    def uri(self, db_name, **params):
+        host, port = self.address
+        query = "&".join(f"{key}={value}" for key, value in params.items())
+        return f"mongodb://{host}:{port}/{db_name}" + (f"?{query}" if query else "")
+
+    def start(self):
+        self._server = socket.create_server(self._listen)
+        threading.Thread(target=self._accept_loop, name="fault-proxy-accept", daemon=True).start()
+        return self
+
+    def stop(self):
+        self._closed = True
+        self._flowing.set()
+        if self._server:
+            # Đánh thức thread đang chờ accept
+            _close(self._server)
+        self._close_all()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def set_mode(self, mode):
+        if mode not in MODES:
+            raise ValueError(f"Chế độ không hợp lệ: {mode} (chọn trong {', '.join(MODES)})")
+        self.mode = mode
+        if mode == "stall":
+            self._flowing.clear()
+        else:
+            self._flowing.set()
+        if mode == "drop":
+            self._close_all()
+
+    def set_latency(self, latency_ms):
+        self.latency_ms = max(0, int(latency_ms))
+
+    def stats(self):
+        with self._lock:
+            active = len(self._sockets) // 2
+        return {"mode": self.mode, "latency_ms": self.latency_ms, "connections": self.connections,
+                "active": active, "bytes_up": self.bytes_up, "bytes_down": self.bytes_down}
+
+    def _close_all(self):
+        with self._lock:
+            sockets = list(self._sockets)
+            self._sockets.clear()
+        for sock in sockets:
+            _reset(sock)
+
+    def _accept_loop(self):
+        while not self._closed:
+            try:
+                client, _ = self._server.accept()
+            except OSError:
+                return
+            if self.mode == "drop":
+                _reset(client)
+                continue
+            try:
+                upstream = socket.create_connection(self.target, timeout=5)
+                upstream.settimeout(None)
+            except OSError:
+                _reset(client)
+                continue
+            for sock in (client, upstream):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with self._lock:
+                self._sockets.update((client, upstream))
+                self.connections += 1
+            threading.Thread(target=self._pump, args=(client, upstream, True), daemon=True).start()
+            threading.Thread(target=self._pump, args=(upstream, client, False), daemon=True).start()
+
+    def _pump(self, source, destination, upstream):
+        try:
+            while True:
+                data = source.recv(BUFFER_SIZE)
+                if not data:
+                    break
+                # stall: giữ dữ liệu lại cho tới khi proxy trở về pass/drop
+                self._flowing.wait()
+                if self._closed or self.mode == "drop":
+                    break
+                if upstream and self.latency_ms:
+                    time.sleep(self.latency_ms / 1000)
+                destination.sendall(data)
+                if upstream:
+                    self.bytes_up += len(data)
+                else:
+                    self.bytes_down += len(data)
+        except OSError:
+            pass
+        finally:
+            with self._lock:
+                self._sockets.discard(source)
+                self._sockets.discard(destination)
+            for sock in (source, destination):
+                if self._closed or self.mode == "drop":
+                    _reset(sock)
+                else:
+                    _close(sock)
+
+    # Cổng điều khiển cho proxy chạy ở process riêng: mỗi dòng là một lệnh
+    # (pass | drop | stall | latency <ms> | stats), trả về một dòng JSON trạng thái
+    def serve_control(self, address):
+        server = socket.create_server(address)
+        while not self._closed:
+            conn, _ = server.accept()
+            with conn, conn.makefile("rw", encoding="utf-8") as stream:
+                for line in stream:
+                    command, *args = line.split() or ["stats"]
+                    try:
+                        if command == "latency":
+                            self.set_latency(args[0])
+                        elif command != "stats":
+                            self.set_mode(command)
+                        reply = self.stats()
+                    except (ValueError, IndexError) as e:
+                        reply = {"error": str(e)}
+                    stream.write(json.dumps(reply) + "\n")
+                    stream.flush()
+
+
+# Điều khiển proxy đang chạy ở process khác qua cổng điều khiển
+class RemoteFaultProxy(_FaultControls):
+    def __init__(self, control, timeout=5):
+        self.control = control
+        self.timeout = timeout
+
+    def _send(self, command):
+        with socket.create_connection(self.control, timeout=self.timeout) as conn, \
+                conn.makefile("rw", encoding="utf-8") as stream:
+            stream.write(command + "\n")
+            stream.flush()
+            reply = json.loads(stream.readline())
+        if "error" in reply:
+            raise ValueError(reply["error"])
+        return reply
+
+    def set_mode(self, mode):
+        self._send(mode)
+
+    def set_latency(self, latency_ms):
+        self._send(f"latency {int(latency_ms)}")
+
+    def stats(self):
+        return self._send("stats")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Proxy TCP gây lỗi/độ trễ giữa app và MongoDB")
+    parser.add_argument("--listen", default="127.0.0.1:27018")
+    parser.add_argument("--target", default="127.0.0.1:27017")
+    parser.add_argument("--control", default="127.0.0.1:27019")
+    args = parser.parse_args(argv)
+    proxy = FaultProxy(target=parse_address(args.target), listen=parse_address(args.listen)).start()
+    print(f"Proxy {args.listen} -> {args.target}, điều khiển tại {args.control}")
+    try:
+        proxy.serve_control(parse_address(args.control))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        proxy.stop()
+
+
+if __name__ == "__main__":
+    main()
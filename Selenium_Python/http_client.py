@@ -0,0 +1,95 @@
+from html.parser import HTMLParser
+import requests
+from requests.adapters import HTTPAdapter
+import settings
+
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+
+# Session HTTP giữ sẵn kết nối (keep-alive) để các test gửi request liên tiếp không phải bắt tay lại
+def new_session(pool_size=16):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+# Đọc các phần tử test cần từ HTML do server render: thông báo lỗi/thành công,
+# tên và giá tour, đoạn văn bản thông báo không có kết quả
+class PageParser(HTMLParser):
+    CAPTURE = {
+        "error-message": "errors",
+        "success-message": "successes",
+        "tour-title": "tour_titles",
+        "tour-price": "tour_prices",
+    }
+
+    def __init__(self):
+        super().__init__()
+        self.data = {key: [] for key in self.CAPTURE.values()}
+        self.data["paragraphs"] = []
+        self._stack = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            return
+        classes = (dict(attrs).get("class") or "").split()
+        targets = [self.CAPTURE[c] for c in classes if c in self.CAPTURE]
+        if tag == "p":
+            targets.append("paragraphs")
+        self._stack.append((tag, targets, []))
+
+    def handle_endtag(self, tag):
+        # Bỏ qua thẻ đóng không khớp (HTML không chuẩn)
+        for i in range(len(self._stack) - 1, -1, -1):
+            if self._stack[i][0] == tag:
+                break
+        else:
+            return
+        while len(self._stack) > i:
+            _, targets, chunks = self._stack.pop()
+            text = " ".join("".join(chunks).split())
+            for key in targets:
+                self.data[key].append(text)
+            if self._stack:
+                self._stack[-1][2].append("".join(chunks))
+
+    def handle_data(self, data):
+        if self._stack:
+            self._stack[-1][2].append(data)
+
+
+def parse_page(html):
+    parser = PageParser()
+    parser.feed(html)
+    parser.close()
+    page = parser.data
+    page["error_message"] = page["errors"][0] if page["errors"] else None
+    page["success_message"] = page["successes"][0] if page["successes"] else None
+    return page
+
+
+def register(session, username, email, password, phone, address, base_url=None, timeout=None):
+    base_url = base_url or settings.BASE_URL
+    return session.post(f"{base_url}/v1/auth/register", timeout=timeout, data={
+        "username": username,
+        "email": email,
+        "password": password,
+        "phoneNumber": phone,
+        "address": address,
+    })
+
+
+# Không tự đi theo redirect để test kiểm tra được trang đích (dashboard hoặc trang chủ)
+def login(session, username, password, base_url=None, timeout=None):
+    base_url = base_url or settings.BASE_URL
+    return session.post(f"{base_url}/v1/auth/login", data={
+        "username": username,
+        "password": password,
+    }, allow_redirects=False, timeout=timeout)
+
+
+def search(session, keyword, base_url=None, timeout=None, **filters):
+    base_url = base_url or settings.BASE_URL
+    return session.get(f"{base_url}/search", params=dict(filters, q=keyword), timeout=timeout)
@@ -0,0 +1,269 @@
+# Đo thời gian mạng của mọi request trình duyệt gửi tới app trong lúc test chạy (bật bằng --network-timing):
+# TTFB (từ lúc gửi xong request tới khi nhận header), download (header -> tải xong body) và
+# DOM-ready (bắt đầu request document -> DOMContentLoaded). Dữ liệu lấy từ performance log của
+# ChromeDriver (sự kiện CDP Network/Page), đọc một lần sau mỗi test nên không thêm round-trip khi test chạy.
+# Ngân sách theo route nằm trong route_budgets.json; vượt ngân sách thì test fail.
+import glob
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from urllib.parse import urlparse
+import pytest
+from selenium.common.exceptions import WebDriverException
+from benchmarks.common import git_revision, percentile
+from change_selection import route_table
+import settings
+
+REPORTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "reports", "network-timings")
+BUDGETS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "route_budgets.json")
+METRICS = ("ttfb_ms", "download_ms", "dom_ready_ms")
+
+
+# Chuyển performance log thành danh sách request: mỗi bước redirect là một request riêng
+def parse_performance_log(entries, origin=None):
+    origin = origin or settings.BASE_URL
+    requests, pending, dom_ready = [], {}, []
+
+    def finish(request_id, response, end_time=None):
+        record = pending.pop(request_id, None)
+        if record is None or not response:
+            return
+        timing = response.get("timing") or {}
+        record["status"] = response.get("status")
+        if timing:
+            start = timing["requestTime"] * 1000
+            headers_at = start + timing["receiveHeadersEnd"]
+            record["ttfb_ms"] = round(timing["receiveHeadersEnd"] - max(timing["sendEnd"], 0), 2)
+            record["download_ms"] = round(end_time * 1000 - headers_at, 2) if end_time else 0.0
+            record["_start"] = start
+        requests.append(record)
+
+    responses = {}
+    for entry in entries:
+        message = json.loads(entry["message"])["message"]
+        method, params = message["method"], message.get("params", {})
+        if method == "Network.requestWillBeSent":
+            if "redirectResponse" in params:
+                finish(params["requestId"], params["redirectResponse"])
+            url = params["request"]["url"]
+            if url.startswith(origin):
+                pending[params["requestId"]] = {"method": params["request"]["method"], "url": url,
+                                                "path": urlparse(url).path or "/", "type": params.get("type")}
+        elif method == "Network.responseReceived" and params["requestId"] in pending:
+            responses[params["requestId"]] = params["response"]
+        elif method in ("Network.loadingFinished", "Network.loadingFailed") and params["requestId"] in pending:
+            finish(params["requestId"], responses.pop(params["requestId"], None), params["timestamp"])
+        elif method == "Page.domContentEventFired":
+            dom_ready.append(params["timestamp"] * 1000)
+
+    # DOMContentLoaded đầu tiên sau khi request document bắt đầu thuộc về document đó
+    for record in requests:
+        if record["type"] == "Document" and "_start" in record and record["status"] and record["status"] < 300:
+            fired = [t for t in dom_ready if t >= record["_start"]]
+            if fired:
+                record["dom_ready_ms"] = round(min(fired) - record["_start"], 2)
+    for record in requests:
+        record.pop("_start", None)
+    return requests
+
+
+def _route_pattern(path):
+    return re.compile("^" + re.sub(r":\w+", "[^/]+", re.escape(path)) + "/?$")
+
+
+# Tìm route của app ứng với request ("GET /tours/:slug"); None nếu không phải route của app (file tĩnh, ...)
+def route_key(method, path, table=None):
+    table = route_table() if table is None else table
+    for route in table:
+        if route["method"] in (method, "ALL") and _route_pattern(route["path"]).match(path):
+            return f"{route['method']} {route['path']}"
+    return None
+
+
+def load_budgets(path=BUDGETS_FILE):
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    return config.get("default", {}), config.get("routes", {})
+
+
+# Trả về danh sách vi phạm ngân sách. Response lỗi 5xx không xét (đó là lỗi chức năng, test khác kiểm tra)
+def check_budgets(requests, budgets):
+    default, routes = budgets
+    violations = []
+    for record in requests:
+        key = record.get("route")
+        if not key or (record.get("status") or 0) >= 500:
+            continue
+        limits = dict(default, **routes.get(key, {}))
+        for metric, limit in limits.items():
+            value = record.get(metric)
+            if value is not None and value > limit:
+                violations.append(f"{key}: {metric} = {value:.0f} ms > {limit} ms ({record['url']})")
+    return violations
+
+
+class NetworkRecorder:
+    def __init__(self):
+        self.enabled = False
+        self.budgets = None
+        self.pools = []
+        self.tests = {}
+        self.violations = {}
+        self._lock = threading.Lock()
+
+    def watch(self, pool):
+        self.pools.append(pool)
+
+    def _drain(self):
+        entries = []
+        for pool in self.pools:
+            for driver in pool.drivers():
+                try:
+                    entries.extend(driver.get_log("performance"))
+                except WebDriverException:
+                    # Phiên không bật performance log hoặc đã đóng
+                    pass
+        return entries
+
+    def reset(self):
+        self._drain()
+
+    def collect(self, nodeid):
+        requests = parse_performance_log(self._drain())
+        for record in requests:
+            record["route"] = route_key(record["method"], record["path"])
+        with self._lock:
+            self.tests.setdefault(nodeid, []).extend(requests)
+        return requests
+
+
+recorder = NetworkRecorder()
+
+
+def pytest_addoption(parser):
+    parser.addoption("--network-timing", action="store_true", default=False,
+                     help="Ghi TTFB/download/DOM-ready của mọi request tới app và kiểm tra ngân sách theo route")
+    parser.addoption("--route-budgets", default=BUDGETS_FILE,
+                     help="File JSON ngân sách thời gian theo route (mặc định route_budgets.json)")
+    parser.addoption("--budgets-report-only", action="store_true", default=False,
+                     help="Chỉ ghi nhận vượt ngân sách, không làm test fail")
+
+
+def pytest_configure(config):
+    if not config.getoption("--network-timing"):
+        return
+    recorder.enabled = True
+    recorder.budgets = load_budgets(config.getoption("--route-budgets"))
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+    if not os.environ.get("PYTEST_XDIST_WORKER"):
+        for path in glob.glob(os.path.join(REPORTS_DIR, "network-*.json")):
+            os.remove(path)
+
+
+# Theo dõi các pool trình duyệt được tạo bởi fixture browser_pool
+@pytest.hookimpl(hookwrapper=True)
+def pytest_fixture_setup(fixturedef, request):
+    outcome = yield
+    if fixturedef.argname == "browser_pool" and outcome.excinfo is None:
+        recorder.watch(outcome.get_result())
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_setup(item):
+    if recorder.enabled:
+        # Bỏ request còn lại từ test trước (reset trình duyệt về about:blank, ...)
+        recorder.reset()
+    yield
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    if not recorder.enabled:
+        return (yield)
+    try:
+        result = yield
+    except BaseException:
+        # Test đã fail: vẫn lưu số liệu, không xét ngân sách
+        record_requests(item)
+        raise
+    violations = check_budgets(record_requests(item), recorder.budgets)
+    if violations:
+        # Ghi lại để process chính in trong phần tổng kết (stdout của worker xdist bị bỏ)
+        with recorder._lock:
+            recorder.violations[item.nodeid] = violations
+        item.user_properties.append(("budget_violations", json.dumps(violations, ensure_ascii=False)))
+        if not item.config.getoption("--budgets-report-only"):
+            pytest.fail("Vượt ngân sách thời gian:\n" + "\n".join(violations), pytrace=False)
+    return result
+
+
+# Số liệu của test được ghi cả vào user_properties (JUnit XML), kể cả khi test fail
+def record_requests(item):
+    requests = recorder.collect(item.nodeid)
+    item.user_properties.append(("network_timing", json.dumps(requests, ensure_ascii=False)))
+    return requests
+
+
+def summarize(tests):
+    by_route = {}
+    for requests in tests.values():
+        for record in requests:
+            if record.get("route"):
+                by_route.setdefault(record["route"], []).append(record)
+    summary = {}
+    for route, records in sorted(by_route.items()):
+        summary[route] = {"count": len(records)}
+        for metric in METRICS:
+            values = sorted(r[metric] for r in records if r.get(metric) is not None)
+            if values:
+                summary[route][metric] = {
+                    "p50": percentile(values, 50),
+                    "p95": percentile(values, 95),
+                    "max": values[-1],
+                }
+    return summary
+
+
+def pytest_sessionfinish(session):
+    if not recorder.enabled:
+        return
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+    if worker == "main" and not recorder.tests:
+        return
+    with open(os.path.join(REPORTS_DIR, f"network-{worker}.json"), "w", encoding="utf-8") as f:
+        json.dump({"worker": worker, "tests": recorder.tests, "violations": recorder.violations},
+                  f, ensure_ascii=False, indent=2)
+
+
+# Process chính gộp dữ liệu các worker, in bảng theo route và ghi thêm một dòng vào history.jsonl để theo dõi xu hướng
+def pytest_terminal_summary(terminalreporter, config):
+    if not recorder.enabled or os.environ.get("PYTEST_XDIST_WORKER"):
+        return
+    tests, violations = {}, {}
+    for path in glob.glob(os.path.join(REPORTS_DIR, "network-*.json")):
+        with open(path, encoding="utf-8") as f:
+            report = json.load(f)
+        tests.update(report["tests"])
+        violations.update(report.get("violations", {}))
+    if violations:
+        terminalreporter.section("Vượt ngân sách thời gian theo route")
+        for nodeid, lines in sorted(violations.items()):
+            terminalreporter.write_line(nodeid)
+            for line in lines:
+                terminalreporter.write_line(f"  {line}")
+    summary = summarize(tests)
+    if not summary:
+        return
+    terminalreporter.section("Thời gian mạng theo route (p50 / p95 ms)")
+    for route, stats in summary.items():
+        columns = []
+        for metric in METRICS:
+            if metric in stats:
+                columns.append(f"{metric[:-3]} {stats[metric]['p50']:.0f}/{stats[metric]['p95']:.0f}")
+        terminalreporter.write_line(f"{route:<32} n={stats['count']:<4} " + "  ".join(columns))
+    with open(os.path.join(REPORTS_DIR, "history.jsonl"), "a", encoding="utf-8") as f:
+        f.write(json.dumps({"created_at": datetime.now().isoformat(timespec="seconds"),
+                            "revision": git_revision(), "routes": summary}, ensure_ascii=False) + "\n")
+    terminalreporter.write_line(f"Chi tiết: {os.path.normpath(REPORTS_DIR)}")
@@ -0,0 +1,173 @@
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+import settings
+from timing_plugin import timed_step
+from waits import DEFAULT_TIMEOUT, Deadline, wait_for_navigation, wait_for_url_contains
+
+# Phần chung cho mọi trang: thông báo lỗi/thành công, đoạn văn bản, lỗi validation của form.
+# Cùng tên khóa với http_client.parse_page để tầng Selenium và tầng HTTP so sánh được với nhau
+COMMON_SCRIPT = """
+const text = el => el ? el.textContent.replace(/\\s+/g, ' ').trim() : null;
+const all = (selector, root) => Array.from((root || document).querySelectorAll(selector));
+const data = {
+    url: location.href,
+    title: document.title,
+    errors: all('.error-message').map(text),
+    successes: all('.success-message').map(text),
+    paragraphs: all('p').map(text),
+    fields: {},
+    form_errors: {},
+};
+for (const input of all('form input[name], form select[name], form textarea[name]')) {
+    data.fields[input.name] = input.value;
+    if (!input.checkValidity()) {
+        data.form_errors[input.name] = input.validationMessage;
+    }
+}
+data.error_message = data.errors[0] || null;
+data.success_message = data.successes[0] || null;
+"""
+
+# Thẻ tour trên trang chủ và trang /search; bỏ các slide Swiper nhân bản khi bật loop
+TOURS_SCRIPT = """
+data.tours = all('.tour-card')
+    .filter(card => !card.closest('.swiper-slide-duplicate'))
+    .map(card => {
+        const link = card.querySelector('a[href^="/tours/"]');
+        return {
+            title: text(card.querySelector('.tour-title, h2, h3')),
+            price: text(card.querySelector('.tour-price')),
+            slug: link ? link.getAttribute('href').split('/').pop() : null,
+        };
+    });
+data.tour_titles = data.tours.map(tour => tour.title);
+data.tour_prices = data.tours.map(tour => tour.price);
+const empty = document.querySelector('.available-tours .swiper-wrapper > p');
+data.message = text(empty);
+"""
+
+TOUR_DETAIL_SCRIPT = """
+const section = document.querySelector('.tour-detail');
+data.tour = section && {
+    name: text(section.querySelector('.tour-header h1')),
+    description: text(section.querySelector('.about p')),
+    price: text(section.querySelector('.price h2 p')),
+    level: text(section.querySelector('.level p')),
+    dates: all('.time p', section).map(text),
+    itinerary: all('.itinerary li', section).map(text).filter(Boolean),
+    slug: (section.querySelector('.add-to-cart-btn') || {dataset: {}}).dataset.slug || null,
+};
+"""
+
+
+# Page object: đọc mọi thứ test cần trên trang bằng một lần execute_script
+# (thay cho find_elements rồi find_element từng phần tử)
+class Page:
+    PATH = "/"
+    SCRIPT = ""
+
+    def __init__(self, driver, base_url=None):
+        self.driver = driver
+        self.base_url = base_url or settings.BASE_URL
+
+    @property
+    def url(self):
+        return f"{self.base_url}{self.PATH}"
+
+    def open(self):
+        self.driver.get(self.url)
+        return self
+
+    def read(self):
+        return self.driver.execute_script(COMMON_SCRIPT + self.SCRIPT + "return data;")
+
+    # Đọc lại trang (mỗi lần một round-trip) tới khi condition(data) đúng; hết thời gian thì
+    # trả về dữ liệu đọc được lần cuối để test tự assert và in thông tin
+    def wait_for(self, condition, timeout=DEFAULT_TIMEOUT):
+        deadline = timeout if isinstance(timeout, Deadline) else Deadline(timeout)
+        last = {}
+
+        def ready(driver):
+            nonlocal last
+            try:
+                last = self.read()
+            except WebDriverException:
+                # Trang đang điều hướng giữa chừng
+                return False
+            return condition(last)
+
+        try:
+            deadline.wait(self.driver).until(ready)
+        except TimeoutException:
+            pass
+        return last or self.read()
+
+    # Chờ có thông báo lỗi hoặc thành công
+    def wait_for_message(self, timeout=DEFAULT_TIMEOUT):
+        return self.wait_for(lambda page: page["errors"] or page["successes"], timeout)
+
+
+class LoginPage(Page):
+    PATH = "/v1/auth/login"
+
+
+class RegisterPage(Page):
+    PATH = "/v1/auth/register"
+
+
+class SearchPage(Page):
+    PATH = "/search"
+    SCRIPT = TOURS_SCRIPT
+
+
+class HomePage(SearchPage):
+    PATH = "/"
+
+
+class TourDetailPage(Page):
+    SCRIPT = TOUR_DETAIL_SCRIPT
+
+    def __init__(self, driver, slug, base_url=None):
+        super().__init__(driver, base_url)
+        self.slug = slug
+
+    @property
+    def url(self):
+        return f"{self.base_url}/tours/{self.slug}"
+
+
+# Luồng thao tác dùng chung cho test_login.py, test_search.py và test_soak.py
+
+# Nhập thông tin đăng nhập trên trang login (các bước chờ dùng chung một ngân sách timeout)
+@timed_step
+def login(driver, username, password, timeout=10):
+    deadline = Deadline(timeout)
+    deadline.wait(driver).until(EC.visibility_of_element_located((By.NAME, "username"))).send_keys(username)
+    deadline.wait(driver).until(EC.visibility_of_element_located((By.NAME, "password"))).send_keys(password)
+    deadline.wait(driver).until(EC.element_to_be_clickable((By.CSS_SELECTOR, "button[type='submit']"))).click()
+
+
+# Đăng xuất; server hủy session và chuyển về trang login
+def logout(driver):
+    driver.get(f"{settings.BASE_URL}/v1/auth/logout")
+
+
+# Tìm kiếm từ thanh tìm kiếm trên trang chủ (toàn bộ các bước dùng chung một ngân sách timeout)
+@timed_step
+def perform_search(driver, keyword, timeout=10):
+    deadline = Deadline(timeout)
+    deadline.wait(driver).until(EC.element_to_be_clickable((By.ID, "search-btn"))).click()
+    search_input = deadline.wait(driver).until(EC.visibility_of_element_located((By.ID, "search-bar")))
+    search_input.clear()
+    search_input.send_keys(keyword)
+    label = driver.find_element(By.CSS_SELECTOR, ".search-bar-container label")
+    wait_for_navigation(driver, lambda: driver.execute_script("arguments[0].click();", label), deadline)
+    wait_for_url_contains(driver, "/search", deadline)
+
+
+# Đọc trang kết quả (thẻ tour, tên, giá, thông báo) bằng một lần execute_script.
+# Trang do server render và perform_search đã chờ DOM sẵn sàng nên không cần chờ thêm
+@timed_step
+def read_results(driver):
+    return SearchPage(driver).read()
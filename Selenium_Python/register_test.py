@@ -1,62 +1,58 @@
 import pytest
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
-from webdriver_manager.chrome import ChromeDriverManager
-from pymongo import MongoClient
-import time
+from browser_profile import profile_from_request
+from cases import REGISTER_CASES, SERVER_ERRORS, sample_user_doc
+from fault_proxy import FAILURE_TIMEOUT
+from pages import RegisterPage
+import settings
+from waits import submit_form
+from timing_plugin import timed_step
+
+# Các test trong module dùng chung collection users và phụ thuộc thứ tự
+pytestmark = [pytest.mark.xdist_group("users"), pytest.mark.routes("/v1/auth/register")]
 
 @pytest.fixture(scope="module")
-def setup_teardown():
-    mongo_client = MongoClient('mongodb://localhost:27017')
-    db = mongo_client['travel']
-    users_collection = db['users']
+def setup_teardown(request, browser_pool, mongo_client, test_db, users_snapshot):
+    users_collection = test_db['users']
     try:
         mongo_client.server_info()
         print("Kết nối MongoDB thành công")
     except Exception as e:
         print(f"Lỗi kết nối MongoDB: {e}")
         pytest.exit(f"MongoDB connection failed: {e}")
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()))
-    base_url = "http://localhost:3000/v1/auth/register"
+    driver = browser_pool.acquire(profile_from_request(request))
+    base_url = f"{settings.BASE_URL}/v1/auth/register"
     yield driver, users_collection, base_url
-    users_collection.delete_many({})
-    driver.quit()
-    mongo_client.close()
-    print("Đã dọn dẹp dữ liệu và đóng trình duyệt/MongoDB")
+    users_snapshot.restore()
+    browser_pool.release(driver)
+    print("Đã dọn dẹp dữ liệu và đóng trình duyệt")
 
-def fill_register_form(driver, base_url, username, email, password, phone, address):
+@timed_step
+def fill_register_form(driver, base_url, username, email, password, phone, address, timeout=10):
     driver.get(base_url)
     driver.find_element(By.NAME, "username").send_keys(username)
     driver.find_element(By.NAME, "email").send_keys(email)
     driver.find_element(By.NAME, "password").send_keys(password)
     driver.find_element(By.NAME, "phoneNumber").send_keys(phone)
     driver.find_element(By.NAME, "address").send_keys(address)
-    driver.find_element(By.TAG_NAME, "button").click()
-    time.sleep(5)
+    # Chờ server trả trang kết quả thay vì sleep cố định
+    submit_form(driver, driver.find_element(By.TAG_NAME, "button"), timeout)
 
+# Đọc thông báo trên trang kết quả bằng một lần execute_script (trang do server render,
+# submit_form đã chờ trang mới tải xong)
+@timed_step
 def get_message(driver, class_name):
-    try:
-        return driver.find_element(By.CLASS_NAME, class_name).text
-    except:
-        return None
+    page = RegisterPage(driver).read()
+    return {"error-message": page["error_message"], "success-message": page["success_message"]}[class_name]
 
 def insert_sample_user(users_collection, username, email, phone_number, admin=False):
-    users_collection.insert_one({
-        'username': username,
-        'email': email,
-        'password': 'hashed_password',
-        'phoneNumber': phone_number,
-        'address': 'Sample Address',
-        'admin': admin,
-        'active': True
-    })
+    users_collection.insert_one(sample_user_doc(username, email, phone_number, admin))
     print(f"Đã chèn user mẫu: {username}")
 
 @pytest.mark.order(1)
-def test_tc01_register_first_user_admin(setup_teardown):
+def test_tc01_register_first_user_admin(setup_teardown, users_snapshot):
     driver, users_collection, base_url = setup_teardown
-    users_collection.delete_many({})
+    users_snapshot.restore()
     print("TC01: Đăng ký người dùng đầu tiên (admin)")
     fill_register_form(driver, base_url, "adminuser", "admin@example.com", "password123", "0987654321", "456 Admin St")
     success_msg = get_message(driver, "success-message")
@@ -75,102 +71,77 @@ def test_tc02_register_success(setup_teardown):
     print("TC02 Passed")
 
 @pytest.mark.order(3)
-def test_tc03_email_already_exists(setup_teardown):
+def test_tc03_email_already_exists(setup_teardown, users_snapshot):
     driver, users_collection, base_url = setup_teardown
-    users_collection.delete_many({})
-    insert_sample_user(users_collection, "existinguser", "existing@example.com", "0111222333")
+    users_snapshot.restore()
     print("TC03: Email đã tồn tại")
-    fill_register_form(driver, base_url, "newuser", "existing@example.com", "password123", "0222333444", "789 New St")
+    case = REGISTER_CASES["email_exists"]
+    for user in case["existing"]:
+        insert_sample_user(users_collection, *user)
+    fill_register_form(driver, base_url, **case["form"])
     error_msg = get_message(driver, "error-message")
-    assert "email đã được đăng ký." in error_msg.lower(), f"TC03 Failed: {error_msg}"
+    assert case["error"] in error_msg.lower(), f"TC03 Failed: {error_msg}"
     print("TC03 Passed")
 
 @pytest.mark.order(4)
-def test_tc04_username_already_exists(setup_teardown):
+def test_tc04_username_already_exists(setup_teardown, users_snapshot):
     driver, users_collection, base_url = setup_teardown
-    users_collection.delete_many({})
-    insert_sample_user(users_collection, "existinguser", "existing@example.com", "0111222333")
+    users_snapshot.restore()
     print("TC04: Username đã tồn tại")
-    fill_register_form(driver, base_url, "existinguser", "new@example.com", "password123", "0222333444", "789 New St")
+    case = REGISTER_CASES["username_exists"]
+    for user in case["existing"]:
+        insert_sample_user(users_collection, *user)
+    fill_register_form(driver, base_url, **case["form"])
     error_msg = get_message(driver, "error-message")
-    assert "tên người dùng đã được sử dụng." in error_msg.lower(), f"TC04 Failed: {error_msg}"
+    assert case["error"] in error_msg.lower(), f"TC04 Failed: {error_msg}"
     print("TC04 Passed")
 
 @pytest.mark.order(5)
-def test_tc05_phone_already_exists(setup_teardown):
+def test_tc05_phone_already_exists(setup_teardown, users_snapshot):
     driver, users_collection, base_url = setup_teardown
-    users_collection.delete_many({})
-    insert_sample_user(users_collection, "existinguser", "existing@example.com", "0111222333")
+    users_snapshot.restore()
     print("TC05: Phone number đã tồn tại")
-    fill_register_form(driver, base_url, "newuser2", "new2@example.com", "password123", "0111222333", "789 New St")
+    case = REGISTER_CASES["phone_exists"]
+    for user in case["existing"]:
+        insert_sample_user(users_collection, *user)
+    fill_register_form(driver, base_url, **case["form"])
     error_msg = get_message(driver, "error-message")
-    assert "số điện thoại đã được đăng ký." in error_msg.lower(), f"TC05 Failed: {error_msg}"
+    assert case["error"] in error_msg.lower(), f"TC05 Failed: {error_msg}"
     print("TC05 Passed")
 
 @pytest.mark.order(6)
-def test_tc06_short_username(setup_teardown):
+def test_tc06_short_username(setup_teardown, users_snapshot):
     driver, users_collection, base_url = setup_teardown
-    users_collection.delete_many({})
+    users_snapshot.restore()
     print("TC06: Username ngắn hơn 6 ký tự")
-    fill_register_form(driver, base_url, "test", "test3@example.com", "password123", "0333444555", "321 Test St")
+    case = REGISTER_CASES["short_username"]
+    for user in case["existing"]:
+        insert_sample_user(users_collection, *user)
+    fill_register_form(driver, base_url, **case["form"])
     error_msg = get_message(driver, "error-message")
-    assert "tên người dùng phải dài ít nhất 6 ký tự." in error_msg.lower(), f"TC06 Failed: {error_msg}"
+    assert case["error"] in error_msg.lower(), f"TC06 Failed: {error_msg}"
     print("TC06 Passed")
 
 @pytest.mark.order(7)
-def test_tc07_empty_email(setup_teardown):
+def test_tc07_empty_email(setup_teardown, users_snapshot):
     driver, users_collection, base_url = setup_teardown
-    users_collection.delete_many({})
+    users_snapshot.restore()
     print("TC07: Trường email bỏ trống")
     fill_register_form(driver, base_url, "testuser3", "", "password123", "0444555666", "654 Test St")
     assert driver.current_url == base_url, f"TC07 Failed: URL không giữ nguyên {driver.current_url}"
     print("TC07 Passed")
 
 @pytest.mark.order(8)
-def test_tc08_server_error_mongodb_disconnected(setup_teardown):
+def test_tc08_server_error_mongodb_disconnected(setup_teardown, users_snapshot, mongo_proxy):
     driver, users_collection, base_url = setup_teardown
-    users_collection.delete_many({})
+    users_snapshot.restore()
     print("TC08: Server Error (MongoDB Disconnected)")
-    mongo_client = MongoClient('mongodb://localhost:27017')
-    mongo_client.close()
-    print("✅ Đã ngắt kết nối MongoDB")
-    fill_register_form(driver, base_url, "testuser8", "test8@example.com", "password123", "0888999777", "888 Test St")
-    passed = False
-    error_indications = []
-    error_msg = get_message(driver, "error-message")
-    if error_msg and ("server" in error_msg.lower() or "error" in error_msg.lower()):
-        passed = True
-        error_indications.append(f"UI Error: {error_msg}")
-    try:
-        logs = driver.get_log('performance')
-        for log in logs:
-            log_str = str(log).lower()
-            if '500' in log_str or 'internal server error' in log_str:
-                passed = True
-                error_indications.append("Network Error: 500 Internal Server Error")
-                break
-    except:
-        pass
-    try:
-        console_errors = driver.get_log('browser')
-        for error in console_errors:
-            if 'failed' in str(error).lower() or '500' in str(error):
-                passed = True
-                error_indications.append(f"Console Error: {error['message']}")
-    except:
-        pass
-    if not passed:
-        page_content = driver.page_source.lower()
-        if 'error' in page_content or '500' in page_content:
-            passed = True
-            error_indications.append("Page Content: Detected 'error' or '500'")
-    try:
-        mongo_client = MongoClient('mongodb://localhost:27017')
-        users_collection = mongo_client['travel']['users']
-        print("✅ Đã khôi phục kết nối MongoDB")
-    except Exception as e:
-        print(f"⚠ Không thể khôi phục MongoDB: {e}")
-    assert passed, f"TC08 Failed: Không phát hiện lỗi server\nDebug Info:\nURL: {driver.current_url}\nPage Title: {driver.title}\nNetwork Logs: {driver.get_log('performance')[:1]}\nConsole Logs: {driver.get_log('browser')[:1]}"
-    print(f"✅ TC08 Passed (Lỗi server được phát hiện):")
-    for indication in error_indications:
-        print(f"   - {indication}")
\ No newline at end of file
+    # Cắt kết nối giữa app và MongoDB qua proxy trong lúc gửi form
+    with mongo_proxy.fault("drop"):
+        print("✅ Đã ngắt kết nối MongoDB")
+        fill_register_form(driver, base_url, "testuser8", "test8@example.com", "password123", "0888999777", "888 Test St",
+                           timeout=FAILURE_TIMEOUT)
+        page_text = driver.find_element(By.TAG_NAME, "body").text
+    assert SERVER_ERRORS["register"] in page_text, f"TC08 Failed: Không phát hiện lỗi server\nURL: {driver.current_url}\nPage: {page_text[:200]}"
+    assert users_collection.count_documents({'username': 'testuser8'}) == 0
+    print("✅ TC08 Passed (Lỗi server được phát hiện)")
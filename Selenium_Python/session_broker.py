@@ -0,0 +1,92 @@
+import threading
+import time
+from urllib.parse import urlparse
+import http_client
+import settings
+
+SESSION_COOKIE = "connect.sid"
+
+
+# Đăng nhập mỗi role một lần qua HTTP, giữ cookie phiên (connect.sid) cho cả phiên test
+# và chỉ đăng nhập lại khi cookie hết hạn hoặc server không còn nhận phiên đó nữa.
+# Cookie được gắn vào WebDriver trước lần điều hướng đầu tiên nên test không phải đi qua form login
+class SessionBroker:
+    def __init__(self, accounts, base_url=None, ensure_account=None):
+        self.accounts = accounts
+        self.base_url = base_url or settings.BASE_URL
+        self.ensure_account = ensure_account
+        self._cache = {}
+        self._lock = threading.Lock()
+        # Giữ kết nối cho các lần kiểm tra phiên, mỗi lần chỉ tốn một GET nhỏ
+        self._check_session = http_client.new_session(pool_size=1)
+
+    def _login(self, role):
+        if self.ensure_account:
+            self.ensure_account(role)
+        username, password = self.accounts[role]
+        session = http_client.new_session(pool_size=1)
+        try:
+            response = http_client.login(session, username, password, base_url=self.base_url)
+            if response.status_code != 302:
+                page = http_client.parse_page(response.text)
+                raise RuntimeError(f"Đăng nhập role '{role}' thất bại: {page['error_message'] or response.status_code}")
+            cookie = next((c for c in session.cookies if c.name == SESSION_COOKIE), None)
+            if cookie is None:
+                raise RuntimeError(f"Server không trả cookie {SESSION_COOKIE} khi đăng nhập role '{role}'")
+            return {"name": cookie.name, "value": cookie.value, "expires": cookie.expires}
+        finally:
+            session.close()
+
+    def _expired(self, entry):
+        return entry["expires"] is not None and entry["expires"] <= time.time()
+
+    # Hỏi lại server mỗi lần phát cookie: phiên mất khi test đăng xuất bằng cookie này hoặc khi app
+    # khởi động lại (session lưu trong bộ nhớ app). Trả về không phải JSON (trang lỗi, ...) coi như đã đăng xuất
+    def _still_logged_in(self, entry):
+        self._check_session.cookies.clear()
+        self._check_session.cookies.set(entry["name"], entry["value"])
+        response = self._check_session.get(f"{self.base_url}/v1/auth/check-login-status")
+        try:
+            return bool(response.ok and response.json().get("loggedIn"))
+        except ValueError:
+            return False
+
+    def cookie(self, role):
+        with self._lock:
+            entry = self._cache.get(role)
+            if entry is None or self._expired(entry) or not self._still_logged_in(entry):
+                entry = self._cache[role] = self._login(role)
+            return entry
+
+    def close(self):
+        self._check_session.close()
+
+    def invalidate(self, role=None):
+        with self._lock:
+            if role is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(role, None)
+
+    def authenticate(self, driver, role):
+        entry = self.cookie(role)
+        try:
+            # Chromium: đặt cookie qua CDP, không cần mở trang nào của app trước
+            driver.execute_cdp_cmd("Network.setCookie", {
+                "name": entry["name"],
+                "value": entry["value"],
+                "url": self.base_url,
+                "path": "/",
+                "httpOnly": True,
+            })
+        except AttributeError:
+            # Trình duyệt khác: phải đứng ở đúng domain mới add_cookie được
+            driver.get(f"{self.base_url}/v1/auth/check-login-status")
+            driver.add_cookie({
+                "name": entry["name"],
+                "value": entry["value"],
+                "domain": urlparse(self.base_url).hostname,
+                "path": "/",
+                "httpOnly": True,
+            })
+        return driver
@@ -0,0 +1,8 @@
+import os
+
+# Cấu hình dùng chung cho bộ test Selenium. Ghi đè bằng biến môi trường để trỏ sang app/MongoDB khác;
+# với --hermetic, fixture app_stack gán lại các giá trị này bằng địa chỉ stack riêng của worker
+# nên code dùng settings.BASE_URL, ... lúc chạy thay vì giá trị mặc định lúc import
+BASE_URL = os.environ.get("BASE_URL", "http://localhost:3000").rstrip("/")
+MONGO_URI = os.environ.get("MONGO_URI", "mongodb://localhost:27017")
+DB_NAME = os.environ.get("DB_NAME", "travel")
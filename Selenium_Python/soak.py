@@ -0,0 +1,202 @@
+# Soak: lặp chu kỳ đăng nhập -> xem trang -> tìm kiếm -> đăng xuất hàng nghìn lần (test_soak.py,
+# bật bằng --soak-cycles N) và lấy mẫu tài nguyên trong lúc chạy: RSS và số handle (file descriptor)
+# của process Node, của Chrome (chromedriver cùng mọi process con) và số kết nối MongoDB đang mở.
+# Cuối cùng tính độ dốc (hồi quy tuyến tính) theo chu kỳ để thấy rò rỉ session store, kết nối
+# hay cache render trước khi deploy. Đọc số liệu từ /proc nên chỉ chạy được trên Linux.
+# Module cũng là plugin pytest: in bảng xu hướng ở phần tổng kết của phiên test.
+import json
+import os
+import time
+from urllib.parse import urlparse
+
+PROC = "/proc"
+# Bỏ qua phần đầu (JIT, cache, pool kết nối đang đầy dần) khi tính xu hướng
+WARMUP_FRACTION = 0.1
+# Độ tăng mỗi chu kỳ (sau warm-up) bị coi là rò rỉ
+LEAK_THRESHOLDS = {
+    "node_rss_kb": 20.0,
+    "node_handles": 0.01,
+    "chrome_rss_kb": 200.0,
+    "chrome_handles": 0.05,
+    "mongo_connections": 0.01,
+}
+
+
+def _children():
+    children = {}
+    for name in os.listdir(PROC):
+        if not name.isdigit():
+            continue
+        try:
+            with open(os.path.join(PROC, name, "stat"), encoding="utf-8") as f:
+                # Tên process nằm trong ngoặc và có thể chứa khoảng trắng: ppid là trường thứ 2 sau ")"
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(name))
+    return children
+
+
+# pid cùng mọi process con cháu (Chrome tách renderer, GPU, network service thành process riêng)
+def process_tree(pid):
+    children = _children()
+    tree, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        tree.append(current)
+        stack.extend(children.get(current, []))
+    return tree
+
+
+def _rss_kb(pid):
+    with open(os.path.join(PROC, str(pid), "status"), encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+# Tổng RSS (kB) và số file descriptor đang mở của cả cây process; process đã thoát thì bỏ qua
+def process_usage(pid):
+    rss, handles, processes = 0, 0, 0
+    for member in process_tree(pid):
+        try:
+            member_rss = _rss_kb(member)
+            member_handles = len(os.listdir(os.path.join(PROC, str(member), "fd")))
+        except OSError:
+            continue
+        rss, handles, processes = rss + member_rss, handles + member_handles, processes + 1
+    return {"rss_kb": rss, "handles": handles, "processes": processes}
+
+
+def _listening_inodes(port):
+    inodes = set()
+    for table in ("tcp", "tcp6"):
+        try:
+            with open(os.path.join(PROC, "net", table), encoding="utf-8") as f:
+                next(f)
+                for line in f:
+                    fields = line.split()
+                    # st = 0A: LISTEN
+                    if int(fields[1].rsplit(":", 1)[1], 16) == port and fields[3] == "0A":
+                        inodes.add(fields[9])
+        except OSError:
+            continue
+    return inodes
+
+
+# Tìm process đang nghe trên cổng của app (khi app không do test tự chạy); None nếu không thấy
+# hoặc process thuộc user khác (không đọc được /proc/<pid>/fd)
+def listening_pid(port):
+    targets = {f"socket:[{inode}]" for inode in _listening_inodes(port)}
+    if not targets:
+        return None
+    for name in os.listdir(PROC):
+        if not name.isdigit():
+            continue
+        fd_dir = os.path.join(PROC, name, "fd")
+        try:
+            for fd in os.listdir(fd_dir):
+                if os.readlink(os.path.join(fd_dir, fd)) in targets:
+                    return int(name)
+        except OSError:
+            continue
+    return None
+
+
+def mongo_connections(client):
+    return client.admin.command("serverStatus")["connections"]["current"]
+
+
+# Hệ số góc bình phương tối thiểu của values theo cycles
+def slope(cycles, values):
+    n = len(cycles)
+    if n < 2:
+        return 0.0
+    mean_x, mean_y = sum(cycles) / n, sum(values) / n
+    variance = sum((x - mean_x) ** 2 for x in cycles)
+    if not variance:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(cycles, values)) / variance
+
+
+class SoakMonitor:
+    def __init__(self, node_pid, chrome_pid, mongo_client):
+        self.node_pid = node_pid
+        self.chrome_pid = chrome_pid
+        self.mongo_client = mongo_client
+        self.samples = []
+        self._last = None
+
+    def sample(self, cycle):
+        now = time.perf_counter()
+        record = {"cycle": cycle}
+        if self._last:
+            last_cycle, last_time = self._last
+            record["cycle_ms"] = round((now - last_time) * 1000 / max(cycle - last_cycle, 1), 2)
+        self._last = (cycle, now)
+        for name, pid in (("node", self.node_pid), ("chrome", self.chrome_pid)):
+            if pid:
+                usage = process_usage(pid)
+                record[f"{name}_rss_kb"] = usage["rss_kb"]
+                record[f"{name}_handles"] = usage["handles"]
+                record[f"{name}_processes"] = usage["processes"]
+        record["mongo_connections"] = mongo_connections(self.mongo_client)
+        self.samples.append(record)
+        return record
+
+    # Xu hướng từng chỉ số sau warm-up: giá trị đầu/cuối/đỉnh, độ dốc mỗi chu kỳ và dự báo cho 1000 chu kỳ
+    def trend(self):
+        if not self.samples:
+            return {}
+        start = self.samples[-1]["cycle"] * WARMUP_FRACTION
+        window = [s for s in self.samples if s["cycle"] >= start] or self.samples
+        metrics = sorted({key for s in window for key in s if key != "cycle"})
+        trend = {}
+        for metric in metrics:
+            points = [(s["cycle"], s[metric]) for s in window if metric in s]
+            cycles, values = zip(*points)
+            per_cycle = slope(cycles, values)
+            trend[metric] = {
+                "first": values[0],
+                "last": values[-1],
+                "peak": max(values),
+                "per_cycle": round(per_cycle, 4),
+                "per_1000_cycles": round(per_cycle * 1000, 1),
+            }
+        return trend
+
+    def leaks(self, trend, thresholds=LEAK_THRESHOLDS):
+        return [f"{metric}: +{trend[metric]['per_cycle']} mỗi chu kỳ (ngưỡng {limit})"
+                for metric, limit in thresholds.items()
+                if metric in trend and trend[metric]["per_cycle"] > limit]
+
+
+def port_of(url):
+    parsed = urlparse(url)
+    return parsed.port or (443 if parsed.scheme == "https" else 80)
+
+
+# Kết quả soak đi theo user_properties của report nên process chính nhận được cả khi chạy với xdist
+def pytest_terminal_summary(terminalreporter):
+    for reports in list(terminalreporter.stats.values()):
+        for report in reports:
+            if getattr(report, "when", None) != "call":
+                continue
+            for name, value in getattr(report, "user_properties", []):
+                if name == "soak":
+                    _write_trend(terminalreporter, report.nodeid, json.loads(value))
+
+
+def _write_trend(terminalreporter, nodeid, result):
+    terminalreporter.section(f"Soak: xu hướng theo chu kỳ ({result['cycles']} chu kỳ, {nodeid})")
+    if not result["node_found"]:
+        terminalreporter.write_line("Không tìm thấy process Node của app (dùng --hermetic hoặc --app-pid), "
+                                    "chỉ đo Chrome và MongoDB")
+    terminalreporter.write_line(f"{'chỉ số':<20} {'đầu':>12} {'cuối':>12} {'đỉnh':>12} {'/chu kỳ':>12} {'/1000 chu kỳ':>14}")
+    for metric, stats in result["trend"].items():
+        terminalreporter.write_line(f"{metric:<20} {stats['first']:>12} {stats['last']:>12} {stats['peak']:>12} "
+                                    f"{stats['per_cycle']:>+12} {stats['per_1000_cycles']:>+14}")
+    for leak in result["leaks"]:
+        terminalreporter.write_line(f"Nghi rò rỉ: {leak}", red=True)
+    terminalreporter.write_line(f"Chi tiết: {result['path']}")
@@ -0,0 +1,29 @@
+import pytest
+from selenium.webdriver.common.by import By
+import settings
+
+# Các trang cần đăng nhập: driver được gắn sẵn cookie phiên, không đi qua form login
+pytestmark = [pytest.mark.xdist_group("users"), pytest.mark.routes("/v1/auth/*")]
+
+
+@pytest.mark.signed_in("admin")
+@pytest.mark.routes("GET /admin/dashboard")
+def test_admin_dashboard_accessible(signed_in_driver):
+    signed_in_driver.get(f"{settings.BASE_URL}/admin/dashboard")
+    assert signed_in_driver.current_url == f"{settings.BASE_URL}/admin/dashboard"
+    assert "Chỉ quản trị viên" not in signed_in_driver.page_source
+
+
+@pytest.mark.signed_in("customer")
+@pytest.mark.routes("GET /profile")
+def test_customer_profile_accessible(signed_in_driver):
+    signed_in_driver.get(f"{settings.BASE_URL}/profile")
+    assert signed_in_driver.current_url == f"{settings.BASE_URL}/profile"
+
+
+@pytest.mark.signed_in("customer")
+@pytest.mark.routes("GET /cart")
+def test_customer_cart_accessible(signed_in_driver):
+    signed_in_driver.get(f"{settings.BASE_URL}/cart")
+    assert signed_in_driver.current_url == f"{settings.BASE_URL}/cart"
+    assert not signed_in_driver.find_elements(By.NAME, "password")
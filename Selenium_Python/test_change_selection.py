@@ -0,0 +1,91 @@
+import change_selection
+from change_selection import controller_methods, match_routes, route_table
+
+# Kiểm tra việc đọc bảng route của change_selection.py trên src/ thật và trên cây src tạm (không cần app)
+
+CONTROLLER = """const Tour = require('../models/Tour');
+
+class SiteController {
+    async index(req, res) {
+        res.render('users/home');
+    }
+
+    Search(req, res) {
+        if (req.query.q) {
+            return res.render('users/search', { tours: [] });
+        }
+        res.render('users/search');
+    }
+}
+
+module.exports = new SiteController();
+"""
+
+
+def write(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+    return path
+
+
+def make_src(tmp_path, site_routes):
+    src = tmp_path / "src"
+    write(src / "routes" / "index.js", "const siteRouter = require('./site');\n"
+                                       "function route(app) {\n    app.use('/', siteRouter);\n}\n")
+    write(src / "routes" / "site.js", "const siteController = require('../app/controllers/SiteController')\n"
+                                      + site_routes + "module.exports = router\n")
+    write(src / "app" / "controllers" / "SiteController.js", CONTROLLER)
+    write(src / "app" / "models" / "Tour.js", "module.exports = {}\n")
+    return str(src)
+
+
+def test_search_route_maps_to_controller_and_view():
+    (route,) = match_routes(["GET /search"], route_table())
+    assert route["handler"] == "SiteController.Search"
+    assert "src/app/controllers/SiteController.js#Search" in route["sources"]
+    assert "src/resources/views/users/search.hbs" in route["sources"]
+    assert "src/routes/site.js" in route["sources"]
+
+
+def test_method_filter_and_glob():
+    table = [{"method": "GET", "path": "/v1/auth/login"}, {"method": "POST", "path": "/v1/auth/login"},
+             {"method": "GET", "path": "/search"}]
+    assert match_routes(["/v1/auth/*"], table) == table[:2]
+    assert match_routes(["POST /v1/auth/*"], table) == [table[1]]
+
+
+def test_commented_routes_are_skipped(tmp_path):
+    src = make_src(tmp_path, "// router.get('/old-search', siteController.OldSearch)\n"
+                             "  // router.post('/legacy', siteController.Legacy)\n"
+                             "router.get('/search', siteController.Search)\n")
+    table = route_table(src)
+    assert [(route["method"], route["path"], route["handler"]) for route in table] == \
+        [("GET", "/search", "SiteController.Search")]
+
+
+def test_controller_split_per_method(tmp_path):
+    path = write(tmp_path / "SiteController.js", CONTROLLER)
+    methods = controller_methods(str(path))
+    # Từ khóa như if( không bị nhận nhầm là method
+    assert list(methods) == ["index", "Search"]
+    # Phần đầu file (require) thuộc về mọi method
+    assert all("require('../models/Tour')" in body for body in methods.values())
+    assert "users/home" in methods["index"] and "users/home" not in methods["Search"]
+
+
+# Sửa thân một method chỉ đổi hash của method đó, các test dùng method khác vẫn dùng lại kết quả cũ
+def test_hash_changes_only_for_edited_method(tmp_path, monkeypatch):
+    monkeypatch.setattr(change_selection, "ROOT_DIR", str(tmp_path))
+    path = write(tmp_path / "SiteController.js", CONTROLLER)
+
+    def hashes():
+        change_selection._hash_source.cache_clear()
+        return {method: change_selection._hash_source(f"SiteController.js#{method}") for method in ("index", "Search")}
+
+    before = hashes()
+    write(path, CONTROLLER.replace("{ tours: [] }", "{ tours: [], message: 'none' }"))
+    after = hashes()
+    change_selection._hash_source.cache_clear()
+
+    assert after["index"] == before["index"]
+    assert after["Search"] != before["Search"]
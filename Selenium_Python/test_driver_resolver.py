@@ -0,0 +1,32 @@
+import os
+import driver_resolver
+from driver_resolver import _cached_version, _scan_local_cache
+
+# Kiểm tra chọn chromedriver trong cache cục bộ theo phiên bản (không cần Chrome hay mạng)
+
+
+def wdm_path(root, version, name="chromedriver"):
+    return os.path.join(root, ".wdm", "drivers", "chromedriver", "linux64", version, "chromedriver-linux64", name)
+
+
+def test_cached_version_compares_numerically():
+    newer = _cached_version(wdm_path("/home/ci", "114.0.5735.198"), "114")
+    older = _cached_version(wdm_path("/home/ci", "114.0.5735.90"), "114")
+    assert newer == (114, 0, 5735, 198)
+    assert newer > older
+
+
+def test_cached_version_ignores_other_majors():
+    assert _cached_version(wdm_path("/home/ci", "113.0.5672.63"), "114") == ()
+
+
+def test_scan_local_cache_picks_newest_build(tmp_path, monkeypatch):
+    for version in ("114.0.5735.90", "114.0.5735.198", "114.0.5735.16", "113.0.5672.63"):
+        path = wdm_path(str(tmp_path), version)
+        os.makedirs(os.path.dirname(path))
+        open(path, "w").close()
+    pattern = os.path.join(str(tmp_path), ".wdm", "**", "chromedriver", "*", "{major}.*", "**", "{name}")
+    monkeypatch.setattr(driver_resolver, "LOCAL_CACHE_PATTERNS", (pattern,))
+
+    assert _scan_local_cache("114") == wdm_path(str(tmp_path), "114.0.5735.198")
+    assert _scan_local_cache("115") is None
@@ -0,0 +1,142 @@
+import socket
+import threading
+import time
+import pytest
+from fault_proxy import FaultProxy
+
+# Kiểm tra fault_proxy.py ở mức socket với một echo server thay cho mongod (không cần app, MongoDB hay trình duyệt)
+TIMEOUT = 5
+
+
+def _echo(conn):
+    with conn:
+        try:
+            while data := conn.recv(4096):
+                conn.sendall(data)
+        except OSError:
+            pass
+
+
+@pytest.fixture
+def echo_server():
+    server = socket.create_server(("127.0.0.1", 0))
+
+    def accept_loop():
+        while True:
+            try:
+                conn, _ = server.accept()
+            except OSError:
+                return
+            threading.Thread(target=_echo, args=(conn,), daemon=True).start()
+
+    threading.Thread(target=accept_loop, daemon=True).start()
+    yield server.getsockname()[:2]
+    server.close()
+
+
+@pytest.fixture
+def proxy(echo_server):
+    with FaultProxy(target=echo_server) as proxy:
+        yield proxy
+
+
+def connect(proxy):
+    sock = socket.create_connection(proxy.address, timeout=TIMEOUT)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return sock
+
+
+def round_trip(sock, payload=b"ping"):
+    sock.sendall(payload)
+    return sock.recv(4096)
+
+
+# Bộ đếm của proxy cập nhật sau khi gửi xong, có thể chậm hơn dữ liệu client nhận được một chút
+def wait_for_stats(proxy, **expected):
+    deadline = time.monotonic() + TIMEOUT
+    while True:
+        stats = proxy.stats()
+        if all(stats[key] == value for key, value in expected.items()) or time.monotonic() > deadline:
+            return stats
+        time.sleep(0.01)
+
+
+# Kết nối bị cắt: RST (ConnectionResetError) hoặc FIN (recv trả về b"") tùy thời điểm
+def is_closed(sock):
+    try:
+        return sock.recv(4096) == b""
+    except ConnectionError:
+        return True
+
+
+# Ở chế độ drop, proxy accept rồi RST ngay nên lỗi có thể xuất hiện ngay từ lúc connect
+def is_refused(proxy):
+    try:
+        with connect(proxy) as sock:
+            return is_closed(sock)
+    except ConnectionError:
+        return True
+
+
+def test_pass_forwards_both_ways(proxy):
+    with connect(proxy) as sock:
+        assert round_trip(sock) == b"ping"
+    stats = wait_for_stats(proxy, bytes_up=4, bytes_down=4)
+    assert stats["mode"] == "pass"
+    assert stats["connections"] == 1
+    assert stats["bytes_up"] == stats["bytes_down"] == 4
+
+
+def test_latency_delays_upstream(proxy):
+    with connect(proxy) as sock:
+        started = time.perf_counter()
+        round_trip(sock)
+        baseline = time.perf_counter() - started
+
+        proxy.set_latency(200)
+        started = time.perf_counter()
+        assert round_trip(sock) == b"ping"
+        delayed = time.perf_counter() - started
+
+    assert delayed >= 0.2
+    assert delayed - baseline >= 0.15
+
+
+def test_stall_holds_data_until_heal(proxy):
+    with connect(proxy) as sock:
+        assert round_trip(sock) == b"ping"
+        proxy.stall()
+        sock.sendall(b"held")
+        # Kết nối vẫn mở nhưng không có dữ liệu nào đi qua
+        sock.settimeout(0.5)
+        with pytest.raises(socket.timeout):
+            sock.recv(4096)
+        assert proxy.stats()["active"] == 1
+
+        proxy.heal()
+        sock.settimeout(TIMEOUT)
+        assert sock.recv(4096) == b"held"
+
+
+def test_drop_resets_open_and_new_connections(proxy):
+    with connect(proxy) as sock:
+        assert round_trip(sock) == b"ping"
+        proxy.drop()
+        assert is_closed(sock)
+    assert wait_for_stats(proxy, active=0)["active"] == 0
+
+    # Kết nối mới vẫn được accept nhưng bị cắt ngay, không tới được echo server
+    assert is_refused(proxy)
+    assert proxy.stats()["connections"] == 1
+
+    proxy.heal()
+    with connect(proxy) as sock:
+        assert round_trip(sock) == b"ping"
+
+
+def test_fault_context_heals(proxy):
+    with proxy.fault("stall", latency_ms=50):
+        assert proxy.stats()["mode"] == "stall"
+        assert proxy.stats()["latency_ms"] == 50
+    assert proxy.stats()["mode"] == "pass"
+    assert proxy.stats()["latency_ms"] == 0
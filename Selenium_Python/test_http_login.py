@@ -0,0 +1,25 @@
+import pytest
+import http_client
+from cases import LOGIN_CASES, login_username
+
+# Tầng HTTP: chạy toàn bộ bảng case đăng nhập không cần trình duyệt
+pytestmark = [pytest.mark.http, pytest.mark.xdist_group("users"), pytest.mark.routes("/v1/auth/*")]
+
+
+@pytest.fixture(scope="module", autouse=True)
+def login_users(login_snapshot):
+    login_snapshot.restore()
+
+
+@pytest.mark.parametrize("case_id", list(LOGIN_CASES))
+def test_login_case(case_id, http):
+    case = LOGIN_CASES[case_id]
+    response = http_client.login(http, login_username(case), case["password"])
+
+    if "redirect" in case:
+        assert response.status_code == 302, f"{case_id}: HTTP {response.status_code}"
+        assert response.headers["Location"] == case["redirect"]
+    else:
+        page = http_client.parse_page(response.text)
+        assert response.status_code == 200, f"{case_id}: HTTP {response.status_code}"
+        assert page["error_message"] and case["error"] in page["error_message"], f"{case_id}: {page['error_message']}"
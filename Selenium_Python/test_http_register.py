@@ -0,0 +1,27 @@
+import pytest
+import http_client
+from cases import REGISTER_CASES, sample_user_doc
+
+# Tầng HTTP: chạy toàn bộ bảng case đăng ký không cần trình duyệt
+pytestmark = [pytest.mark.http, pytest.mark.xdist_group("users"), pytest.mark.routes("/v1/auth/register")]
+
+
+@pytest.mark.parametrize("case_id", list(REGISTER_CASES))
+def test_register_case(case_id, http, test_db, users_snapshot):
+    case = REGISTER_CASES[case_id]
+    users_snapshot.restore()
+    users_collection = test_db['users']
+    for user in case["existing"]:
+        users_collection.insert_one(sample_user_doc(*user))
+
+    response = http_client.register(http, **case["form"])
+    page = http_client.parse_page(response.text)
+
+    assert response.status_code == 200, f"{case_id}: HTTP {response.status_code}"
+    if "error" in case:
+        assert page["error_message"] and case["error"] in page["error_message"].lower(), f"{case_id}: {page['error_message']}"
+        assert users_collection.count_documents({}) == len(case["existing"])
+    else:
+        assert page["success_message"] and page["success_message"].lower() == case["success"], f"{case_id}: {page['success_message']}"
+        user = users_collection.find_one({'username': case["form"]["username"]})
+        assert user and user['admin'] == case["admin"]
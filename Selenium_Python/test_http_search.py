@@ -0,0 +1,24 @@
+import pytest
+import http_client
+from cases import SEARCH_CASES
+
+# Tầng HTTP: chạy toàn bộ bảng case tìm kiếm không cần trình duyệt
+pytestmark = [pytest.mark.http, pytest.mark.xdist_group("tours"), pytest.mark.routes("GET /search")]
+
+
+@pytest.fixture(scope="module", autouse=True)
+def tours(tours_snapshot):
+    tours_snapshot.restore()
+
+
+@pytest.mark.parametrize("case_id", list(SEARCH_CASES))
+def test_search_case(case_id, http):
+    case = SEARCH_CASES[case_id]
+    response = http_client.search(http, case["q"])
+    page = http_client.parse_page(response.text)
+
+    assert response.status_code == 200, f"{case_id}: HTTP {response.status_code}"
+    for name in case.get("expect", []):
+        assert name in page["tour_titles"], f"{case_id}: '{name}' không có trong {page['tour_titles']}"
+    if "count" in case:
+        assert len(page["tour_titles"]) == case["count"], f"{case_id}: {page['tour_titles']}"
@@ -1,100 +1,80 @@
 import pytest
-import bcrypt
-from datetime import datetime
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from pymongo import MongoClient
-from pymongo.errors import ServerSelectionTimeoutError
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+from cases import LOGIN_CASES, SERVER_ERRORS, login_username
+from fault_proxy import FAILURE_TIMEOUT
+from pages import LoginPage, login, logout
+import settings
 
-# Fixture khởi tạo trình duyệt
-@pytest.fixture
-def driver():
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()))
-    driver.get("http://localhost:3000/v1/auth/logout")
-    driver.get("http://localhost:3000/v1/auth/login")
-    yield driver
-    driver.quit()
+# Dùng chung dữ liệu users với register_test.py nên chạy cùng worker
+pytestmark = [pytest.mark.xdist_group("users"),
+              pytest.mark.routes("/v1/auth/*", "GET /admin/dashboard", "GET /")]
 
-# Fixture kết nối MongoDB
+# Fixture khởi tạo trình duyệt (lấy từ pool, cookie/storage được reset sau mỗi test)
 @pytest.fixture
-def mongo_collection():
-    client = MongoClient("mongodb://localhost:27017/", serverSelectionTimeoutMS=5000)
-    db = client["travel"]
-    yield db["users"]
-
-# Lấy hoặc tạo user ngẫu nhiên
-def get_valid_user(mongo_collection, admin=True):
-    try:
-        user = mongo_collection.aggregate([
-            {"$match": {"admin": admin}},
-            {"$sample": {"size": 1}}
-        ]).next()
-        return user["username"], "123456"
-    except StopIteration:
-        username = f"testuser_{datetime.now().strftime('%Y%m%d%H%M%S')}"
-        hashed_password = bcrypt.hashpw("123456".encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-        mongo_collection.insert_one({"username": username, "password": hashed_password, "admin": admin})
-        return username, "123456"
+def driver(pooled_driver):
+    logout(pooled_driver)
+    pooled_driver.get(f"{settings.BASE_URL}/v1/auth/login")
+    yield pooled_driver
 
-# Hàm nhập thông tin đăng nhập
-def login(driver, username, password):
-    WebDriverWait(driver, 10).until(EC.visibility_of_element_located((By.NAME, "username"))).send_keys(username)
-    WebDriverWait(driver, 10).until(EC.visibility_of_element_located((By.NAME, "password"))).send_keys(password)
-    WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.CSS_SELECTOR, "button[type='submit']"))).click()
+# Lấy user có sẵn trong credential pool (không cần truy vấn hay hash mật khẩu khi chạy test)
+def get_valid_user(credentials, admin=True):
+    return credentials.take("admin" if admin else "customer", exclusive=True)
 
 # TC01: Đăng nhập thành công (admin)
-def test_login_success(driver, mongo_collection):
-    username, password = get_valid_user(mongo_collection, admin=True)
-    login(driver, username, password)
-    WebDriverWait(driver, 15).until(EC.url_to_be("http://localhost:3000/admin/dashboard"))
-    assert driver.current_url == "http://localhost:3000/admin/dashboard"
+def test_login_success(driver, credentials):
+    case = LOGIN_CASES["admin_success"]
+    username, _ = get_valid_user(credentials, admin=case["user"] == "admin")
+    login(driver, username, case["password"])
+    WebDriverWait(driver, 15).until(EC.url_to_be(f"{settings.BASE_URL}{case['redirect']}"))
+    assert driver.current_url == f"{settings.BASE_URL}{case['redirect']}"
 
 # TC02: Đăng nhập tài khoản khách hàng
-def test_login_customer_redirect(driver, mongo_collection):
-    username, password = get_valid_user(mongo_collection, admin=False)
-    login(driver, username, password)
-    WebDriverWait(driver, 15).until(EC.url_to_be("http://localhost:3000/"))
-    assert driver.current_url == "http://localhost:3000/"
+def test_login_customer_redirect(driver, credentials):
+    case = LOGIN_CASES["customer_success"]
+    username, _ = get_valid_user(credentials, admin=case["user"] == "admin")
+    login(driver, username, case["password"])
+    WebDriverWait(driver, 15).until(EC.url_to_be(f"{settings.BASE_URL}{case['redirect']}"))
+    assert driver.current_url == f"{settings.BASE_URL}{case['redirect']}"
 
 # TC03: Đăng nhập với username sai
-def test_login_wrong_username(driver, mongo_collection):
-    _, password = get_valid_user(mongo_collection)
-    login(driver, "wronguser", password)
-    error_message = WebDriverWait(driver, 15).until(EC.visibility_of_element_located((By.CLASS_NAME, "error-message"))).text
-    assert driver.current_url == "http://localhost:3000/v1/auth/login"
-    assert error_message
+def test_login_wrong_username(driver, credentials):
+    case = LOGIN_CASES["wrong_username"]
+    login(driver, login_username(case), case["password"])
+    error_message = LoginPage(driver).wait_for_message(15)["error_message"]
+    assert driver.current_url == f"{settings.BASE_URL}/v1/auth/login"
+    assert case["error"] in error_message
 
 # TC04: Đăng nhập với password sai
-def test_login_wrong_password(driver, mongo_collection):
-    username, _ = get_valid_user(mongo_collection)
-    login(driver, username, "wrongpass")
-    error_message = WebDriverWait(driver, 15).until(EC.visibility_of_element_located((By.CLASS_NAME, "error-message"))).text
-    assert driver.current_url == "http://localhost:3000/v1/auth/login"
-    assert error_message
+def test_login_wrong_password(driver, credentials):
+    case = LOGIN_CASES["wrong_password"]
+    username, _ = get_valid_user(credentials, admin=case["user"] == "admin")
+    login(driver, username, case["password"])
+    error_message = LoginPage(driver).wait_for_message(15)["error_message"]
+    assert driver.current_url == f"{settings.BASE_URL}/v1/auth/login"
+    assert case["error"] in error_message
 
 # TC05: Đăng nhập với cả username và password sai
-def test_login_both_wrong(driver, mongo_collection):
-    login(driver, "wronguser", "wrongpass")
-    error_message = WebDriverWait(driver, 15).until(EC.visibility_of_element_located((By.CLASS_NAME, "error-message"))).text
-    assert driver.current_url == "http://localhost:3000/v1/auth/login"
-    assert error_message
+def test_login_both_wrong(driver, credentials):
+    case = LOGIN_CASES["both_wrong"]
+    login(driver, login_username(case), case["password"])
+    error_message = LoginPage(driver).wait_for_message(15)["error_message"]
+    assert driver.current_url == f"{settings.BASE_URL}/v1/auth/login"
+    assert case["error"] in error_message
 
 # TC06: Đăng nhập với trường trống
 def test_login_empty_fields(driver):
     WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.CSS_SELECTOR, "button[type='submit']"))).click()
-    assert driver.current_url == "http://localhost:3000/v1/auth/login"
+    assert driver.current_url == f"{settings.BASE_URL}/v1/auth/login"
 
-# TC07: Đăng nhập khi kết nối MongoDB thất bại
-def test_login_db_connection_failure(driver, monkeypatch):
-    def mock_mongo_client(*args, **kwargs):
-        raise ServerSelectionTimeoutError("Không thể kết nối đến MongoDB")
-    monkeypatch.setattr("pymongo.MongoClient", mock_mongo_client)
+# TC07: Đăng nhập khi kết nối MongoDB thất bại (proxy cắt kết nối giữa app và MongoDB)
+def test_login_db_connection_failure(driver, credentials, mongo_proxy):
+    username, password = get_valid_user(credentials, admin=False)
     WebDriverWait(driver, 10).until(EC.visibility_of_element_located((By.NAME, "username")))
-    login(driver, "testuser", "123456")
-    error_message = WebDriverWait(driver, 15).until(EC.visibility_of_element_located((By.CLASS_NAME, "error-message"))).text
-    assert driver.current_url == "http://localhost:3000/v1/auth/login"
-    assert error_message
\ No newline at end of file
+    with mongo_proxy.fault("drop"):
+        login(driver, username, password)
+        # App trả JSON lỗi 500 ngay tại POST /v1/auth/login
+        WebDriverWait(driver, FAILURE_TIMEOUT).until(
+            EC.text_to_be_present_in_element((By.TAG_NAME, "body"), SERVER_ERRORS["login"]))
+    assert driver.current_url == f"{settings.BASE_URL}/v1/auth/login"
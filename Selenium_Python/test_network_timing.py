@@ -0,0 +1,131 @@
+import json
+import pytest
+from benchmarks.common import percentile
+from network_timing import check_budgets, parse_performance_log, route_key, summarize
+
+# Kiểm tra network_timing.py trên performance log ghi sẵn (dạng ChromeDriver trả về), không cần trình duyệt
+ORIGIN = "http://127.0.0.1:3000"
+
+
+def entry(method, **params):
+    message = {"message": {"method": method, "params": params}, "webview": "E5D1"}
+    return {"level": "INFO", "message": json.dumps(message), "timestamp": 0}
+
+
+def request_sent(request_id, url, method="GET", resource_type="Document", **extra):
+    return entry("Network.requestWillBeSent", requestId=request_id, type=resource_type,
+                 request={"method": method, "url": url}, **extra)
+
+
+# timing của CDP: requestTime tính bằng giây, các mốc khác là ms tính từ requestTime
+def response(status, request_time, send_end, headers_end):
+    return {"status": status, "timing": {"requestTime": request_time, "sendEnd": send_end,
+                                         "receiveHeadersEnd": headers_end}}
+
+
+# Đăng nhập: POST /v1/auth/login trả 302 tới /admin/dashboard (cùng requestId), kèm một file tĩnh
+# và một request ra ngoài origin của app
+@pytest.fixture
+def login_redirect_log():
+    return [
+        request_sent("1000.1", f"{ORIGIN}/v1/auth/login", method="POST"),
+        request_sent("1000.1", f"{ORIGIN}/admin/dashboard",
+                     redirectResponse=response(302, 100.0, 1.0, 51.0)),
+        entry("Network.responseReceived", requestId="1000.1", response=response(200, 100.06, 2.0, 82.0)),
+        request_sent("1000.2", f"{ORIGIN}/css/admin.css", resource_type="Stylesheet"),
+        request_sent("1000.3", "https://cdn.example.com/jquery.js", resource_type="Script"),
+        entry("Network.loadingFinished", requestId="1000.1", timestamp=100.15),
+        entry("Network.responseReceived", requestId="1000.2", response=response(200, 100.16, 0.5, 10.5)),
+        entry("Network.loadingFinished", requestId="1000.2", timestamp=100.18),
+        entry("Network.responseReceived", requestId="1000.3", response=response(200, 100.16, 0.5, 40.5)),
+        entry("Network.loadingFinished", requestId="1000.3", timestamp=100.25),
+        entry("Page.domContentEventFired", timestamp=100.4),
+    ]
+
+
+# Hai trang liên tiếp: mỗi DOMContentLoaded thuộc về document bắt đầu ngay trước nó
+@pytest.fixture
+def two_pages_log():
+    return [
+        entry("Page.domContentEventFired", timestamp=199.0),
+        request_sent("2000.1", f"{ORIGIN}/"),
+        entry("Network.responseReceived", requestId="2000.1", response=response(200, 200.0, 1.0, 101.0)),
+        entry("Network.loadingFinished", requestId="2000.1", timestamp=200.2),
+        entry("Page.domContentEventFired", timestamp=200.5),
+        request_sent("2000.2", f"{ORIGIN}/search?q=H%C3%A0%20N%E1%BB%99i"),
+        entry("Network.responseReceived", requestId="2000.2", response=response(200, 201.0, 1.0, 61.0)),
+        entry("Network.loadingFinished", requestId="2000.2", timestamp=201.1),
+        entry("Page.domContentEventFired", timestamp=201.3),
+    ]
+
+
+def test_redirect_hops_are_separate_requests(login_redirect_log):
+    requests = parse_performance_log(login_redirect_log, origin=ORIGIN)
+    login, dashboard, stylesheet = requests
+
+    assert (login["method"], login["path"], login["status"]) == ("POST", "/v1/auth/login", 302)
+    assert login["ttfb_ms"] == pytest.approx(50.0)
+    assert login["download_ms"] == 0.0
+    # DOM-ready chỉ tính cho document trả về trang, không cho bước redirect
+    assert "dom_ready_ms" not in login
+
+    assert (dashboard["method"], dashboard["path"], dashboard["status"]) == ("GET", "/admin/dashboard", 200)
+    assert dashboard["ttfb_ms"] == pytest.approx(80.0)
+    assert dashboard["download_ms"] == pytest.approx(8.0)
+    assert dashboard["dom_ready_ms"] == pytest.approx(340.0)
+
+    assert stylesheet["path"] == "/css/admin.css"
+    assert "dom_ready_ms" not in stylesheet
+    # Request ra ngoài origin của app bị bỏ qua
+    assert all(r["url"].startswith(ORIGIN) for r in requests)
+
+
+def test_dom_ready_goes_to_the_latest_document(two_pages_log):
+    home, search = parse_performance_log(two_pages_log, origin=ORIGIN)
+    assert home["dom_ready_ms"] == pytest.approx(500.0)
+    assert search["path"] == "/search"
+    assert search["dom_ready_ms"] == pytest.approx(300.0)
+
+
+def test_route_key_matches_app_routes():
+    assert route_key("GET", "/tours/ha-noi-2-ngay-1-dem") == "GET /tours/:slug"
+    assert route_key("POST", "/v1/auth/login") == "POST /v1/auth/login"
+    assert route_key("GET", "/css/admin.css") is None
+
+
+def test_budget_violations_skip_server_errors():
+    budgets = ({"ttfb_ms": 1000, "dom_ready_ms": 3000}, {"GET /search": {"ttfb_ms": 500}})
+    requests = [
+        {"route": "GET /search", "url": f"{ORIGIN}/search", "status": 200, "ttfb_ms": 600.0, "dom_ready_ms": 3500.0},
+        # 5xx là lỗi chức năng, không tính vào ngân sách thời gian
+        {"route": "GET /search", "url": f"{ORIGIN}/search", "status": 500, "ttfb_ms": 9000.0},
+        # Không phải route của app
+        {"route": None, "url": f"{ORIGIN}/css/site.css", "status": 200, "ttfb_ms": 9000.0},
+        {"route": "GET /", "url": f"{ORIGIN}/", "status": 200, "ttfb_ms": 900.0},
+    ]
+    violations = check_budgets(requests, budgets)
+    assert violations == [
+        f"GET /search: ttfb_ms = 600 ms > 500 ms ({ORIGIN}/search)",
+        f"GET /search: dom_ready_ms = 3500 ms > 3000 ms ({ORIGIN}/search)",
+    ]
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 11))
+    assert percentile(values, 50) == 5
+    assert percentile(values, 95) == 10
+    assert percentile(values, 0) == 1
+    assert percentile([42], 99) == 42
+    assert percentile([], 50) is None
+
+
+def test_summarize_by_route():
+    tests = {
+        "test_a": [{"route": "GET /", "ttfb_ms": 10.0}, {"route": None, "ttfb_ms": 99.0}],
+        "test_b": [{"route": "GET /", "ttfb_ms": 30.0, "dom_ready_ms": 200.0}, {"route": "GET /", "ttfb_ms": 20.0}],
+    }
+    summary = summarize(tests)
+    assert list(summary) == ["GET /"]
+    assert summary["GET /"]["count"] == 3
+    assert summary["GET /"]["ttfb_ms"] == {"p50": 20.0, "p95": 30.0, "max": 30.0}
+    assert summary["GET /"]["dom_ready_ms"] == {"p50": 200.0, "p95": 200.0, "max": 200.0}
@@ -0,0 +1,65 @@
+import json
+import pytest
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from benchmarks.common import save_results
+from cases import SEARCH_CASES
+from pages import HomePage, TourDetailPage, login, logout, perform_search, read_results
+from soak import SoakMonitor, listening_pid, port_of
+import settings
+
+# Chỉ chạy khi có --soak-cycles N (kiểm tra trước khi mở trình duyệt hay dựng dữ liệu)
+pytestmark = [pytest.mark.soak,
+              pytest.mark.skipif("not config.getoption('--soak-cycles')", reason="Chỉ chạy khi có --soak-cycles N"),
+              pytest.mark.xdist_group("users"),
+              pytest.mark.routes("/v1/auth/*", "GET /", "GET /search", "GET /tours/:slug")]
+
+
+def node_pid(request, app_stack):
+    if app_stack:
+        return app_stack.app_pid
+    return request.config.getoption("--app-pid") or listening_pid(port_of(settings.BASE_URL))
+
+
+def chrome_pid(driver):
+    service = getattr(driver, "service", None)
+    return service.process.pid if service and service.process else None
+
+
+# Một chu kỳ: đăng nhập (customer) -> trang chủ và trang chi tiết một tour -> tìm kiếm -> đăng xuất
+def run_cycle(driver, username, password, keyword):
+    driver.get(f"{settings.BASE_URL}/v1/auth/login")
+    login(driver, username, password)
+    WebDriverWait(driver, 15).until(EC.url_to_be(f"{settings.BASE_URL}/"))
+    tours = HomePage(driver).read()["tours"]
+    if tours and tours[0]["slug"]:
+        TourDetailPage(driver, tours[0]["slug"]).open().read()
+        driver.get(f"{settings.BASE_URL}/")
+    perform_search(driver, keyword)
+    read_results(driver)
+    logout(driver)
+    assert driver.current_url == f"{settings.BASE_URL}/v1/auth/login"
+
+
+def test_soak_cycles(request, record_property, app_stack, pooled_driver, credentials, tours_snapshot, mongo_client):
+    cycles = request.config.getoption("--soak-cycles")
+    sample_every = request.config.getoption("--soak-sample-every")
+    tours_snapshot.restore()
+    username, password = credentials.take("customer")
+    keyword = SEARCH_CASES["valid_keyword"]["q"]
+
+    monitor = SoakMonitor(node_pid(request, app_stack), chrome_pid(pooled_driver), mongo_client)
+    print(f"Soak {cycles} chu kỳ: {monitor.sample(0)}")
+    for cycle in range(1, cycles + 1):
+        run_cycle(pooled_driver, username, password, keyword)
+        if cycle % sample_every == 0 or cycle == cycles:
+            print(f"Chu kỳ {cycle}: {monitor.sample(cycle)}")
+
+    trend = monitor.trend()
+    leaks = monitor.leaks(trend)
+    path = save_results("soak", {"config": {"cycles": cycles, "sample_every": sample_every},
+                                 "samples": monitor.samples, "trend": trend, "leaks": leaks})
+    # Bảng xu hướng được in ở phần tổng kết (soak.py), kể cả khi chạy song song với -n
+    record_property("soak", json.dumps({"cycles": cycles, "node_found": bool(monitor.node_pid), "trend": trend,
+                                        "leaks": leaks, "path": path}, ensure_ascii=False))
+    assert not leaks, "Tài nguyên tăng đều theo chu kỳ:\n" + "\n".join(leaks)
@@ -0,0 +1,214 @@
+import functools
+import glob
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlparse
+import pytest
+import requests
+from pymongo import monitoring
+from selenium.webdriver.remote.webdriver import WebDriver
+
+REPORTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "reports", "step-timings")
+
+
+# Ghi lại thời gian từng bước (lệnh WebDriver, helper chờ, lệnh MongoDB, request HTTP)
+# theo test đang chạy. Tắt mặc định, bật bằng --step-timings
+class StepRecorder:
+    def __init__(self):
+        self.enabled = False
+        self.current_test = None
+        self.current_phase = None
+        self.tests = defaultdict(lambda: {"phases": {}, "steps": []})
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _parents(self):
+        if not hasattr(self._local, "parents"):
+            self._local.parents = []
+        return self._local.parents
+
+    def record(self, kind, name, duration, **extra):
+        if not self.enabled or self.current_test is None:
+            return
+        parents = self._parents()
+        step = {
+            "kind": kind,
+            "name": name,
+            "duration_ms": round(duration * 1000, 3),
+            "phase": self.current_phase,
+            "parent": parents[-1] if parents else None,
+        }
+        step.update(extra)
+        with self._lock:
+            self.tests[self.current_test]["steps"].append(step)
+
+    def measure(self, kind, name, func, *args, **kwargs):
+        parents = self._parents()
+        parents.append(name)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            parents.pop()
+            self.record(kind, name, time.perf_counter() - start)
+
+
+recorder = StepRecorder()
+
+
+# Đánh dấu helper của test (login, perform_search, ...) để đo thời gian khi bật --step-timings
+def timed_step(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not recorder.enabled:
+            return func(*args, **kwargs)
+        return recorder.measure("helper", func.__name__, func, *args, **kwargs)
+    return wrapper
+
+
+class MongoTimingListener(monitoring.CommandListener):
+    def __init__(self):
+        self._pending = {}
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        self._pending[event.request_id] = collection if isinstance(collection, str) else None
+
+    def _finish(self, event, failed):
+        collection = self._pending.pop(event.request_id, None)
+        name = f"{event.database_name}.{collection}.{event.command_name}" if collection else f"{event.database_name}.{event.command_name}"
+        recorder.record("mongo", name, event.duration_micros / 1e6, failed=failed)
+
+    def succeeded(self, event):
+        self._finish(event, False)
+
+    def failed(self, event):
+        self._finish(event, True)
+
+
+_patched = False
+
+
+def _install_patches():
+    global _patched
+    if _patched:
+        return
+    _patched = True
+    # Thêm listener trước khi tạo MongoClient để mọi client trong phiên đều được đo
+    monitoring.register(MongoTimingListener())
+
+    original_execute = WebDriver.execute
+
+    def execute(self, driver_command, params=None):
+        if not recorder.enabled:
+            return original_execute(self, driver_command, params)
+        return recorder.measure("webdriver", driver_command, original_execute, self, driver_command, params)
+
+    WebDriver.execute = execute
+
+    original_request = requests.Session.request
+
+    def request(self, method, url, *args, **kwargs):
+        if not recorder.enabled:
+            return original_request(self, method, url, *args, **kwargs)
+        return recorder.measure("http", f"{method.upper()} {urlparse(url).path}", original_request, self, method, url, *args, **kwargs)
+
+    requests.Session.request = request
+
+
+def pytest_addoption(parser):
+    parser.addoption("--step-timings", action="store_true", default=False,
+                     help="Đo thời gian từng bước (WebDriver, helper, MongoDB, HTTP) và ghi JSON vào reports/step-timings")
+    parser.addoption("--step-timings-top", type=int, default=15,
+                     help="Số bước chậm nhất in ra cuối phiên")
+
+
+def pytest_configure(config):
+    if not config.getoption("--step-timings"):
+        return
+    recorder.enabled = True
+    _install_patches()
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+    if not os.environ.get("PYTEST_XDIST_WORKER"):
+        # Process chính: xóa kết quả của lần chạy trước để không bị gộp nhầm
+        for path in glob.glob(os.path.join(REPORTS_DIR, "timings-*.json")):
+            os.remove(path)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    recorder.current_test = item.nodeid
+    yield
+    recorder.current_test = None
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_setup(item):
+    recorder.current_phase = "setup"
+    yield
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    recorder.current_phase = "call"
+    yield
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_teardown(item, nextitem):
+    recorder.current_phase = "teardown"
+    yield
+
+
+def pytest_runtest_logreport(report):
+    # Chỉ process thực sự chạy test mới ghi (process chính của xdist chỉ nhận lại report)
+    if recorder.enabled and recorder.current_test is not None:
+        recorder.tests[report.nodeid]["phases"][report.when] = round(report.duration * 1000, 3)
+        recorder.tests[report.nodeid]["outcome"] = report.outcome
+
+
+def summarize(tests):
+    totals = defaultdict(lambda: {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+    for data in tests.values():
+        for step in data["steps"]:
+            entry = totals[f"{step['kind']}:{step['name']}"]
+            entry["count"] += 1
+            entry["total_ms"] = round(entry["total_ms"] + step["duration_ms"], 3)
+            entry["max_ms"] = max(entry["max_ms"], step["duration_ms"])
+    return dict(sorted(totals.items(), key=lambda kv: kv[1]["total_ms"], reverse=True))
+
+
+def pytest_sessionfinish(session):
+    if not recorder.enabled:
+        return
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+    tests = dict(recorder.tests)
+    if worker == "main" and not tests:
+        # Chạy song song: process chính không chạy test, dữ liệu nằm trong file của các worker
+        return
+    with open(os.path.join(REPORTS_DIR, f"timings-{worker}.json"), "w", encoding="utf-8") as f:
+        json.dump({"worker": worker, "tests": tests, "summary": summarize(tests)}, f, ensure_ascii=False, indent=2)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if not recorder.enabled or os.environ.get("PYTEST_XDIST_WORKER"):
+        return
+    tests = {}
+    for path in glob.glob(os.path.join(REPORTS_DIR, "timings-*.json")):
+        with open(path, encoding="utf-8") as f:
+            tests.update(json.load(f)["tests"])
+    steps = [dict(step, test=nodeid) for nodeid, data in tests.items() for step in data["steps"]]
+    if not steps:
+        return
+    top = config.getoption("--step-timings-top")
+    terminalreporter.section(f"{top} bước chậm nhất")
+    for step in sorted(steps, key=lambda s: s["duration_ms"], reverse=True)[:top]:
+        parent = f" (trong {step['parent']})" if step["parent"] else ""
+        terminalreporter.write_line(f"{step['duration_ms']:>10.1f} ms  {step['kind']}:{step['name']}{parent}  {step['test']} [{step['phase']}]")
+    terminalreporter.section("Tổng thời gian theo loại bước")
+    for key, entry in list(summarize(tests).items())[:top]:
+        terminalreporter.write_line(f"{entry['total_ms']:>10.1f} ms  x{entry['count']:<5} max {entry['max_ms']:.1f} ms  {key}")
+    terminalreporter.write_line(f"Chi tiết: {os.path.normpath(REPORTS_DIR)}")
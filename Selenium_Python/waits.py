@@ -0,0 +1,62 @@
+import time
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+DEFAULT_TIMEOUT = 10
+POLL_FREQUENCY = 0.05
+
+
+# Ngân sách thời gian cho một lần gọi helper: mọi bước chờ bên trong dùng chung
+# phần thời gian còn lại thay vì mỗi bước có timeout riêng
+class Deadline:
+    def __init__(self, timeout=DEFAULT_TIMEOUT):
+        self.timeout = timeout
+        self.expires_at = time.monotonic() + timeout
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def wait(self, driver):
+        return WebDriverWait(driver, self.remaining(), poll_frequency=POLL_FREQUENCY)
+
+
+def _as_deadline(timeout):
+    return timeout if isinstance(timeout, Deadline) else Deadline(timeout)
+
+
+def _document_ready(driver):
+    try:
+        return driver.execute_script("return document.readyState") != "loading"
+    except WebDriverException:
+        return False
+
+
+# Thực hiện action rồi chờ trình duyệt commit trang mới (document cũ bị thay thế)
+# và DOM của trang mới đã parse xong
+def wait_for_navigation(driver, action, timeout=DEFAULT_TIMEOUT):
+    deadline = _as_deadline(timeout)
+    old_document = driver.find_element(By.TAG_NAME, "html")
+    action()
+    deadline.wait(driver).until(EC.staleness_of(old_document))
+    deadline.wait(driver).until(_document_ready)
+
+
+# Submit form qua nút bấm; nếu form không hợp lệ (HTML5 validation) trình duyệt
+# sẽ không gửi request nên trả về ngay, không chờ điều hướng
+def submit_form(driver, button, timeout=DEFAULT_TIMEOUT):
+    deadline = _as_deadline(timeout)
+    valid = driver.execute_script("return !arguments[0].form || arguments[0].form.checkValidity();", button)
+    if not valid:
+        button.click()
+        return False
+    wait_for_navigation(driver, button.click, deadline)
+    return True
+
+
+# Chờ URL hiện tại chứa path (ví dụ "/search") và trang đã tải xong
+def wait_for_url_contains(driver, fragment, timeout=DEFAULT_TIMEOUT):
+    deadline = _as_deadline(timeout)
+    deadline.wait(driver).until(EC.url_contains(fragment))
+    deadline.wait(driver).until(_document_ready)
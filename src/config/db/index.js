@@ -2,8 +2,8 @@ const mongoose = require('mongoose');
 
 async function connect() {
     try {
-        // Kết nối đến MongoDB
-        await mongoose.connect('mongodb://localhost:27017/travel');
+        // Kết nối đến MongoDB (MONGODB_URI cho phép test trỏ app sang database riêng)
+        await mongoose.connect(process.env.MONGODB_URI || 'mongodb://localhost:27017/travel');
 
         console.log('Connect successfully!!!');
     } catch (error) {
@@ -12,7 +12,7 @@ const cron = require('node-cron');
 const ManagerOrderController = require('./app/controllers/ManagerOrderController');
 const methodOverride = require('method-override');
 const app = express();
-const port = 3000;
+const port = process.env.PORT || 3000; // PORT cho phép chạy nhiều bản app song song (test --hermetic)
 const route = require('./routes');
 const db = require('./config/db');
 const User = require('./app/models/User'); // Mô hình người dùng